@@ -0,0 +1,85 @@
+# ---- Benchmark filter engine ----
+# Jalankan dari root repo:  python -m benchmarks.bench_filters
+# Kombinasi filter acak (satu nilai atau beberapa nilai per dimensi) dijawab
+# dengan: mask boolean pandas (scan kolom), Arrow compute pada tabel, dan
+# bitmap FilterIndex. Mencetak waktu rata-rata per query (jumlah baris).
+import argparse
+import time
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from benchmarks import synthetic
+from produk_lokal.filters import DIMENSI, FilterIndex
+
+
+def random_filters(index, n, seed=1):
+    rng = np.random.default_rng(seed)
+
+    def pilih(nilai):
+        r = rng.random()
+        if r < 0.4:
+            return None
+        if r < 0.7:
+            return str(rng.choice(nilai))
+        return [str(v) for v in rng.choice(nilai, size=min(3, len(nilai)), replace=False)]
+
+    return [{dim: pilih(index.options(dim)) for dim in DIMENSI} for _ in range(n)]
+
+
+def pandas_count(df, filter):
+    mask = np.ones(len(df), dtype=bool)
+    for dim, kolom in DIMENSI.items():
+        nilai = filter[dim]
+        if nilai is not None:
+            mask &= df[kolom].isin(nilai if isinstance(nilai, list) else [nilai]).to_numpy()
+    return int(mask.sum())
+
+
+def arrow_count(table, filter):
+    # Arrow compute langsung di tabel (pembanding; dashboard memakai bitmap)
+    expr = None
+    for dim, kolom in DIMENSI.items():
+        nilai = filter[dim]
+        if nilai is None:
+            continue
+        syarat = pc.field(kolom).isin(nilai if isinstance(nilai, list) else [nilai])
+        expr = syarat if expr is None else expr & syarat
+    return (table.filter(expr) if expr is not None else table).num_rows
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10**5, 10**6, 10**7])
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'baris':>10} {'build':>8} {'bitmap MB':>10} {'pandas':>9} {'arrow':>9} {'bitmap':>9}")
+    for n_rows in args.rows:
+        df = synthetic.listings(n_rows)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+        mulai = time.perf_counter()
+        index = FilterIndex(table)
+        t_build = time.perf_counter() - mulai
+        filters = random_filters(index, args.queries)
+
+        waktu = {}
+        hasil = {}
+        for nama, fn in (
+            ("pandas", lambda f: pandas_count(df, f)),
+            ("arrow", lambda f: arrow_count(table, f)),
+            ("bitmap", lambda f: index.count(**f)),
+        ):
+            mulai = time.perf_counter()
+            hasil[nama] = [fn(f) for f in filters]
+            waktu[nama] = (time.perf_counter() - mulai) / len(filters)
+        assert hasil["pandas"] == hasil["arrow"] == hasil["bitmap"]
+
+        print(f"{n_rows:>10,} {t_build:>7.2f}s {index.nbytes / 1024**2:>10.1f} "
+              + " ".join(f"{waktu[nama] * 1000:>7.2f}ms" for nama in ("pandas", "arrow", "bitmap")))
+
+
+if __name__ == "__main__":
+    main()
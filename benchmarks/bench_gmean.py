@@ -0,0 +1,60 @@
+# ---- Benchmark rata-rata geometrik per grup ----
+# Jalankan dari root repo:  python -m benchmarks.bench_gmean
+# Membandingkan groupby(...).agg(gmean) (callback Python per grup) dengan
+# grouped_gmean (bincount pada kode grup) di 10^5 - 10^7 baris, untuk kolom
+# string biasa dan kolom kategorikal.
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import synthetic
+from produk_lokal.stats import gmean, grouped_gmean
+
+def string_frame(n_rows):
+    # Kolom grup sebagai string biasa (skema sebelum compact_frame)
+    df = synthetic.listings(n_rows)
+    return pd.DataFrame({
+        "Kategori": df["Kategori"].astype(str),
+        "PROVINCE": df["PROVINCE"].astype(str),
+        "Produk": np.where(df["is_local"], "Lokal", "Impor"),
+        "PRICE": df["PRICE"].astype("float64"),
+    })
+
+
+def _timed(fn, repeat):
+    hasil = []
+    for _ in range(repeat):
+        mulai = time.perf_counter()
+        fn()
+        hasil.append(time.perf_counter() - mulai)
+    return min(hasil)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10**5, 10**6, 10**7])
+    parser.add_argument("--by", nargs="+", default=["Kategori", "Produk"])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    by = args.by
+    print(f"{'baris':>10} {'kolom':>8} {'callback':>12} {'vektor':>12} {'speedup':>8}")
+    for n_rows in args.rows:
+        df_str = string_frame(n_rows)
+        df_cat = df_str.astype({kolom: "category" for kolom in by})
+
+        for jenis, df in (("string", df_str), ("kategori", df_cat)):
+            lama = df.groupby(by, observed=True)["PRICE"].agg(gmean)
+            baru = grouped_gmean(df, by).set_index(by)["Mean Price"]
+            assert np.allclose(lama.to_numpy(), baru.reindex(lama.index).to_numpy())
+
+            t_lama = _timed(lambda: df.groupby(by, observed=True)["PRICE"].agg(gmean), args.repeat)
+            t_baru = _timed(lambda: grouped_gmean(df, by), args.repeat)
+            print(f"{n_rows:>10,} {jenis:>8} {t_lama * 1000:>10.1f}ms "
+                  f"{t_baru * 1000:>10.1f}ms {t_lama / t_baru:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
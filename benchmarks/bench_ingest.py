@@ -0,0 +1,65 @@
+# ---- Benchmark ingest paralel ----
+# Jalankan dari root repo:  python -m benchmarks.bench_ingest
+# Membuat beberapa file export sintetis (satu per "marketplace", default xlsx
+# karena parsing openpyxl yang paling berat), lalu meng-ingest semuanya ke
+# store kosong dengan 1, 2, 4, ... proses pembaca. Mencetak throughput
+# (baris/detik) dan speedup terhadap 1 proses.
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks import synthetic
+from produk_lokal import ingest
+from produk_lokal.cube import DIMENSI
+
+
+def write_exports(tmp, n_files, n_rows, fmt):
+    paths = []
+    for i in range(n_files):
+        path = Path(tmp) / f"export-{i}.{fmt}"
+        if fmt == "xlsx":
+            synthetic.raw_listings(n_rows, seed=i).to_excel(path, index=False)
+        else:
+            synthetic.write_raw(path, n_rows, seed=i)
+        paths.append(path)
+    return paths
+
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=6)
+    parser.add_argument("--rows", type=int, default=20_000, help="baris per file")
+    parser.add_argument("--format", choices=["xlsx", "csv", "parquet"], default="xlsx")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1))))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = write_exports(tmp, args.files, args.rows, args.format)
+        total = args.files * args.rows
+        print(f"{args.files} file x {args.rows:,} baris ({args.format}), {cores} core")
+        print(f"{'workers':>8} {'waktu':>9} {'baris/s':>12} {'speedup':>8}")
+
+        dasar = acuan = None
+        for workers in args.workers:
+            store_dir = Path(tmp) / f"store-{workers}"
+            mulai = time.perf_counter()
+            for _ in ingest.ingest_many(paths, store_dir, tanggal="2025-03-24", workers=workers):
+                pass
+            detik = time.perf_counter() - mulai
+            dasar = dasar or detik
+
+            # Isi store harus sama untuk berapa pun jumlah worker
+            cube = ingest.load_store_cube(store_dir).sort_values(DIMENSI, ignore_index=True)
+            acuan = cube if acuan is None else acuan
+            pd.testing.assert_frame_equal(cube, acuan)
+            print(f"{workers:>8} {detik:>8.2f}s {total / detik:>12,.0f} {dasar / detik:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# ---- Benchmark load data: cold vs warm ----
+# Jalankan dari root repo:  python -m benchmarks.bench_load
+#   cold     : parse workbook + pembersihan + tulis cache Parquet
+#   parquet  : cache Parquet sudah ada, memori proses kosong (worker baru)
+#   memori   : rerun Streamlit biasa (cache memori proses sudah terisi)
+# Di akhir dicetak laporan memori per kolom (skema asli vs skema ringkas).
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from produk_lokal import config, loader
+
+
+def _timed(fn, repeat):
+    hasil = []
+    for _ in range(repeat):
+        mulai = time.perf_counter()
+        fn()
+        hasil.append(time.perf_counter() - mulai)
+    return min(hasil)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default=config.DATA_PATH)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        def cold():
+            loader.clear_memory_cache()
+            for f in Path(cache_dir).glob("*.parquet"):
+                f.unlink()
+            loader.load_listings(args.data, cache_dir)
+
+        def parquet():
+            loader.clear_memory_cache()
+            loader.load_listings(args.data, cache_dir)
+
+        def memori():
+            loader.load_listings(args.data, cache_dir)
+
+        waktu = {
+            "cold": _timed(cold, args.repeat),
+            "parquet": _timed(parquet, args.repeat),
+            "memori": _timed(memori, args.repeat),
+        }
+
+    for nama, detik in waktu.items():
+        print(f"{nama:<8} {detik * 1000:10.2f} ms   ({waktu['cold'] / detik:8.1f}x)")
+
+    # Kolom yang sama tanpa skema ringkas, untuk pembanding memori
+    ringkas = loader.load_listings(args.data, cache_dir)
+    asli = ringkas[loader.SELECTED_COLUMNS].astype(
+        {kolom: "str" for kolom in loader.CATEGORY_COLUMNS} | {"PRICE": "float64"})
+    print()
+    with pd.option_context("display.float_format", "{:.3f}".format, "display.width", 120):
+        print(loader.memory_report(asli, ringkas))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+# ---- Benchmark payload chart ----
+# Jalankan dari root repo:  python -m benchmarks.bench_payload
+# Untuk tiap tingkat detail peta provinsi: ukuran spec choropleth (KB) dengan
+# GeoJSON ditanam (inline) vs dirujuk lewat URL statis, waktu membangun +
+# serialisasi figure (cache miss) dan waktu mengambil spec dari cache figure.
+# Butuh aset GeoJSON di assets/ (atau shapefile untuk membuatnya).
+import argparse
+import tempfile
+import time
+
+import pandas as pd
+import plotly.express as px
+
+from produk_lokal import figures, geo
+
+
+def choropleth(tolerance, mode, static_dir):
+    geojson = geo.load_province_geojson(tolerance)
+    count = pd.DataFrame({"PROVINCE": geo.province_names(geojson)})
+    count["count"] = range(len(count))
+    if mode == "url":
+        geojson = geo.province_geojson_url(tolerance, static_dir=static_dir)
+    fig = px.choropleth(count, geojson=geojson, locations="PROVINCE",
+                        featureidkey="properties.ADM1_EN", color="count")
+    fig.update_geos(fitbounds="locations", visible=False)
+    return fig
+
+
+def _timed(fn, repeat):
+    mulai = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - mulai) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'detail':>8} {'mode':>7} {'KB':>9} {'build+json':>11} {'cache':>9}")
+    with tempfile.TemporaryDirectory() as static_dir:
+        for tolerance, label in geo.TOLERANSI.items():
+            for mode in ("inline", "url"):
+                build = lambda: choropleth(tolerance, mode, static_dir)
+                dingin = _timed(lambda: build().to_json(validate=False), args.repeat)
+
+                key = ("bench_peta", tolerance, mode)
+                spec = figures.plotly_figure(key, build)
+                hangat = _timed(lambda: figures.plotly_figure(key, build), args.repeat)
+                print(f"{label:>8} {mode:>7} {spec.nbytes / 1024:>9,.1f} "
+                      f"{dingin:>9.1f}ms {hangat:>7.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
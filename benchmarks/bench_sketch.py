@@ -0,0 +1,83 @@
+# ---- Benchmark sketch kuantil ----
+# Jalankan dari root repo:  python -m benchmarks.bench_sketch
+# Membandingkan kuantil (q25, q50, q75, q95) untuk filter acak: sort penuh pada
+# baris yang difilter vs gabungan sketch per sel cube, plus box_summary yang
+# dipakai boxplot dashboard. Mencetak waktu query rata-rata dan galat relatif
+# terbesar; gagal kalau galat melewati ALPHA.
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks import synthetic
+from produk_lokal.boxplot import box_summary
+from produk_lokal.sketch import ALPHA, SketchIndex, build_sketches
+
+QS = [0.25, 0.5, 0.75, 0.95]
+
+
+def random_filters(n, seed=1):
+    # Kombinasi filter acak; None berarti semua nilai
+    rng = np.random.default_rng(seed)
+    pilih = lambda nilai: None if rng.random() < 0.5 else str(rng.choice(nilai))
+    return [
+        {"marketplace": pilih(synthetic.MARKETPLACE), "provinsi": pilih(synthetic.province_names()),
+         "kategori": pilih(synthetic.KATEGORI), "produk": pilih(["Lokal", "Impor"])}
+        for _ in range(n)
+    ]
+
+
+def exact_quantiles(df, marketplace, provinsi, kategori, produk):
+    mask = np.ones(len(df), dtype=bool)
+    if marketplace is not None:
+        mask &= (df["MARKETPLACE"] == marketplace).to_numpy()
+    if provinsi is not None:
+        mask &= (df["PROVINCE"] == provinsi).to_numpy()
+    if kategori is not None:
+        mask &= (df["Kategori"] == kategori).to_numpy()
+    if produk is not None:
+        mask &= df["is_local"].to_numpy() == (produk == "Lokal")
+    price = df["PRICE"].to_numpy(dtype="float64")[mask]
+    return np.quantile(price, QS, method="lower") if len(price) else np.full(len(QS), np.nan)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10**5, 10**6, 10**7])
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+
+    filters = random_filters(args.queries)
+    print(f"{'baris':>10} {'build':>8} {'sel x bucket':>13} {'sort penuh':>11} "
+          f"{'sketch':>9} {'boxplot':>9} {'galat maks':>11}")
+    for n_rows in args.rows:
+        df = synthetic.listings(n_rows)
+
+        mulai = time.perf_counter()
+        index = SketchIndex(build_sketches(df))
+        t_build = time.perf_counter() - mulai
+
+        mulai = time.perf_counter()
+        exact = [exact_quantiles(df, **f) for f in filters]
+        t_exact = (time.perf_counter() - mulai) / len(filters)
+
+        mulai = time.perf_counter()
+        approx = [index.quantiles(QS, **f) for f in filters]
+        t_sketch = (time.perf_counter() - mulai) / len(filters)
+
+        mulai = time.perf_counter()
+        for f in filters:
+            box_summary(index, f["kategori"], f["provinsi"])
+        t_box = (time.perf_counter() - mulai) / len(filters)
+
+        exact, approx = np.array(exact), np.array(approx)
+        positif = exact > 0
+        galat = np.max(np.abs(approx[positif] - exact[positif]) / exact[positif])
+        assert np.array_equal(approx[~positif] == 0, exact[~positif] == 0)
+        assert galat <= ALPHA + 1e-9, galat
+        print(f"{n_rows:>10,} {t_build:>7.2f}s {index.matrix.size:>13,} {t_exact * 1000:>9.2f}ms "
+              f"{t_sketch * 1000:>7.2f}ms {t_box * 1000:>7.2f}ms {galat:>10.3%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# ---- Benchmark memori ingest streaming ----
+# Jalankan dari root repo:  python -m benchmarks.bench_streaming
+# Membuat CSV sintetis berukuran 2x10^5 - 3x10^6 baris, lalu meng-ingest tiap
+# file ke store kosong (ingest.ingest_batch, jalur yang sama dengan CLI) di
+# proses terpisah dan mencatat RSS puncak.
+#
+# Memori kerja = RSS puncak - RSS setelah import - hash PRODUCT LINK (16 byte
+# per baris: 8 byte hash + salinan saat disisipkan, satu-satunya bagian yang
+# memang ikut jumlah baris). Memori kerja seharusnya mengikuti ukuran chunk,
+# bukan ukuran file: benchmark gagal (exit != 0) kalau memori kerja naik lebih
+# dari --tolerance antara dua ukuran berurutan mana pun. Ukuran di bawah
+# MIN_CHUNK chunk tidak ikut dibandingkan: memori baru stabil setelah chunk
+# kedua (chunk sebelumnya belum dikembalikan ke allocator saat chunk baru dibaca).
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks import synthetic
+from produk_lokal import ingest, streaming
+
+BYTE_HASH_PER_BARIS = 16
+MIN_CHUNK = 2
+
+
+def _rss_mb():
+    # RSS puncak proses ini. ru_maxrss ikut terbawa dari proses induk lewat
+    # fork+exec (induk yang membuat CSV besar), jadi di Linux dipakai VmHWM
+    # yang direset saat exec
+    try:
+        with open("/proc/self/status") as f:
+            for baris in f:
+                if baris.startswith("VmHWM:"):
+                    return int(baris.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _worker(path, chunksize):
+    dasar = _rss_mb()
+    mulai = time.perf_counter()
+    with tempfile.TemporaryDirectory() as store_dir:
+        info = ingest.ingest_batch(path, store_dir, tanggal="2025-03-24", chunksize=chunksize)
+    detik = time.perf_counter() - mulai
+    print(f"{dasar:.1f} {_rss_mb():.1f} {detik:.3f} {info['baris_baru'] + info['duplikat']}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[2 * 10**5, 10**6, 3 * 10**6])
+    parser.add_argument("--chunksize", type=int, default=streaming.CHUNKSIZE)
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="kenaikan memori kerja relatif yang masih diterima antar ukuran")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.worker, args.chunksize)
+        return
+
+    kerja = {}
+    print(f"{'baris':>10} {'file':>9} {'RSS puncak':>11} {'kerja':>8} {'waktu':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in sorted(args.rows):
+            path = Path(tmp) / f"sintetis-{n_rows}.csv"
+            synthetic.write_raw(path, n_rows)
+            keluaran = subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_streaming",
+                 "--worker", str(path), "--chunksize", str(args.chunksize)],
+                check=True, capture_output=True, text=True,
+            ).stdout.split()
+            dasar, puncak, detik, jumlah = map(float, keluaran)
+            assert jumlah <= n_rows
+            kerja[n_rows] = puncak - dasar - n_rows * BYTE_HASH_PER_BARIS / 1024**2
+            print(f"{n_rows:>10,} {path.stat().st_size / 1024**2:>7.0f}MB "
+                  f"{puncak:>9.0f}MB {kerja[n_rows]:>6.0f}MB {detik:>7.1f}s")
+            path.unlink()
+
+    ukuran = [n_rows for n_rows in sorted(kerja) if n_rows >= MIN_CHUNK * args.chunksize]
+    if len(ukuran) < len(kerja):
+        print(f"ukuran < {MIN_CHUNK} chunk ({MIN_CHUNK * args.chunksize:,} baris) tidak dibandingkan")
+    gagal = []
+    for kecil, besar in zip(ukuran, ukuran[1:]):
+        naik = kerja[besar] / kerja[kecil] - 1
+        print(f"memori kerja {kecil:,} -> {besar:,} baris: {naik:+.0%} (batas {args.tolerance:+.0%})")
+        if naik > args.tolerance:
+            gagal.append(f"{kecil:,} -> {besar:,} baris ({kerja[kecil]:.0f}MB -> {kerja[besar]:.0f}MB)")
+    if gagal:
+        sys.exit("GAGAL: memori kerja ikut naik dengan jumlah baris: " + "; ".join(gagal))
+
+
+if __name__ == "__main__":
+    main()
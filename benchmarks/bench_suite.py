@@ -0,0 +1,189 @@
+# ---- Suite benchmark skala data (keluaran JSON) ----
+# Jalankan dari root repo:
+#   python -m benchmarks.bench_suite --rows 10000 100000 1000000 --out hasil.json
+# Per ukuran data sintetis (benchmarks.synthetic) diukur:
+#   load      : normalize_lokasi + merge provinsi, pembersihan penuh, tulis/baca Parquet
+#   chart     : penyiapan data tiap chart dari cube; boxplot seperti dashboard:
+#               box_summary dari SketchIndex (build sketch diukur terpisah)
+#   rerun     : seluruh script lewat AppTest (store sintetis, proses terpisah):
+#               run pertama, rerun dengan cache hangat, dan pindah ke tiap tab
+# Parse xlsx tidak diukur di sini (membuat xlsx 10^7 baris tidak praktis);
+# lihat bench_load untuk workbook asli. Tabel ringkas dicetak ke stderr,
+# JSON ke --out (default stdout) supaya bisa dibandingkan antar commit.
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from benchmarks import synthetic
+from produk_lokal import analytics, build_cube, loader
+from produk_lokal.boxplot import box_summary
+from produk_lokal.filters import FilterIndex
+from produk_lokal.sketch import SketchIndex, build_sketches
+from produk_lokal.lokasi import resolve_lokasi
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+TABS = ["Dominasi Produk", "Sebaran Lokasi", "Analisis Harga"]
+
+
+def _timed(fn, repeat):
+    hasil = []
+    for _ in range(repeat):
+        mulai = time.perf_counter()
+        fn()
+        hasil.append(time.perf_counter() - mulai)
+    return min(hasil)
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR,
+                              check=True, capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_load(raw, repeat, tmp):
+    waktu = {
+        "normalize_lokasi+merge": _timed(lambda: resolve_lokasi(raw["LOCATION"]), repeat),
+        "clean_listings": _timed(lambda: loader.clean_listings(raw), repeat),
+    }
+    df = loader.clean_listings(raw)
+    path = Path(tmp) / "listings.parquet"
+    waktu["tulis_parquet"] = _timed(lambda: df.to_parquet(path), repeat)
+    waktu["baca_parquet"] = _timed(lambda: pd.read_parquet(path), repeat)
+    return waktu, df
+
+
+def bench_chart(df, repeat):
+    cube = build_cube(df)
+    tabel = pa.Table.from_pandas(df, preserve_index=False)
+    index = FilterIndex(tabel)
+    kategori = index.options("kategori")[0]
+    sketches = SketchIndex(build_sketches(df))
+
+    return {
+        "build_cube": _timed(lambda: build_cube(df), repeat),
+        "donut": _timed(lambda: analytics.lokal_impor_share(cube), repeat),
+        "bar_platform": _timed(lambda: (
+            analytics.lokal_impor_share(cube, marketplace="Blibli"),
+            analytics.kategori_counts(cube, marketplace="Blibli")), repeat),
+        "peta": _timed(lambda: (
+            analytics.provinsi_counts(cube), analytics.top_provinsi(cube)), repeat),
+        "grouped_bar": _timed(lambda: (
+            analytics.gmean_per_kategori(cube), analytics.gmean_extremes(cube),
+            analytics.gmean_lokal_impor(cube)), repeat),
+        "filter_index": _timed(lambda: FilterIndex(tabel), repeat),
+        "build_sketch": _timed(lambda: SketchIndex(build_sketches(df)), repeat),
+        "boxplot": _timed(lambda: box_summary(sketches), repeat),
+        "boxplot_kategori": _timed(lambda: box_summary(sketches, kategori), repeat),
+    }
+
+
+def bench_rerun(n_rows, repeat, tmp):
+    # Store dan cache lewat env supaya config di proses worker mengarah ke tmp
+    env = dict(os.environ,
+               PRODUK_LOKAL_STORE=str(Path(tmp) / "store"),
+               PRODUK_LOKAL_CACHE=str(Path(tmp) / "cache"))
+    keluaran = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_suite",
+         "--worker", str(n_rows), "--repeat", str(repeat)],
+        cwd=ROOT_DIR, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(keluaran.splitlines()[-1])
+
+
+def _worker(n_rows, repeat):
+    from streamlit.testing.v1 import AppTest
+
+    from produk_lokal import config, ingest
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "batch.parquet"
+        synthetic.write_raw(path, n_rows)
+        ingest.ingest_batch(path, config.STORE_DIR, tanggal="2025-03-24")
+
+    at = AppTest.from_file(str(ROOT_DIR / "streamlit-app.py"), default_timeout=600)
+    mulai = time.perf_counter()
+    at.run()
+    waktu = {"run_pertama": time.perf_counter() - mulai}
+    waktu["rerun"] = _timed(at.run, repeat)
+
+    galat = {}
+    for tab in TABS:
+        # Tab terbuka di-set ulang tiap run (AppTest tidak menyimpan pilihan tab)
+        def buka(tab=tab):
+            at.session_state["tab_aktif"] = tab
+            at.run()
+
+        waktu[f"tab:{tab}"] = _timed(buka, repeat)
+        if at.exception:
+            galat[tab] = at.exception[0].value
+    print(json.dumps({"waktu": waktu, "galat": galat}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10**4, 10**5, 10**6])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--rerun-max", type=int, default=10**6,
+                        help="lewati skenario rerun di atas jumlah baris ini")
+    parser.add_argument("--out", type=Path)
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        _worker(args.worker, args.repeat)
+        return
+
+    hasil = []
+    for n_rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            raw = synthetic.raw_listings(n_rows)
+            waktu_load, df = bench_load(raw, args.repeat, tmp)
+            del raw
+            skenario = {"load": waktu_load, "chart": bench_chart(df, args.repeat)}
+            galat = {}
+            if n_rows <= args.rerun_max:
+                rerun = bench_rerun(n_rows, args.repeat, tmp)
+                skenario["rerun"], galat = rerun["waktu"], rerun["galat"]
+
+        for grup, waktu in skenario.items():
+            for nama, detik in waktu.items():
+                hasil.append({"baris": n_rows, "grup": grup, "skenario": nama,
+                              "detik": round(detik, 6)})
+                print(f"{n_rows:>10,} {grup:<6} {nama:<24} {detik * 1000:>10.1f}ms",
+                      file=sys.stderr)
+        for tab, pesan in galat.items():
+            hasil.append({"baris": n_rows, "grup": "rerun", "skenario": f"tab:{tab}",
+                          "galat": pesan})
+            print(f"{n_rows:>10,} galat di tab {tab}: {pesan}", file=sys.stderr)
+
+    laporan = {
+        "meta": {
+            "waktu": pd.Timestamp.now().isoformat(timespec="seconds"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "hasil": hasil,
+    }
+    teks = json.dumps(laporan, indent=2, ensure_ascii=False)
+    if args.out:
+        args.out.write_text(teks + "\n", encoding="utf-8")
+    else:
+        print(teks)
+
+
+if __name__ == "__main__":
+    main()
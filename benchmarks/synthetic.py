@@ -0,0 +1,94 @@
+# ---- Data listing sintetis untuk benchmark ----
+# Skema mengikuti Identifikasi-Brand-E-Commerce.xlsx (kolom yang dipakai
+# pipeline): harga log-normal, LOCATION dari nama kabupaten/kota BPS asli
+# (format "Kab. X" / "Kota X" seperti di workbook), sebagian ASAL BRAND '-'.
+#   iter_raw / raw_listings / write_raw : baris mentah, lewat pembersihan penuh
+#   listings                            : frame ringkas seperti hasil load_listings
+import numpy as np
+import pandas as pd
+
+from produk_lokal import wilayah
+
+KATEGORI = [
+    'Elektronik & Gadget', 'Fashion & Aksesoris', 'Hobi, Seni, & Olahraga',
+    'Ibu, Bayi & Anak', 'Lain-Lain', 'Makanan & Minuman', 'Otomotif & Mesin',
+    'Perawatan Diri & Kesehatan', 'Rumah Tangga & Furniture',
+]
+MARKETPLACE = ["Blibli", "Bukalapak", "OLX"]
+ASAL_BRAND = ["ID", "CN", "US", "JP", "KR", "AU", "-"]
+ASAL_BOBOT = [0.6, 0.12, 0.08, 0.06, 0.04, 0.02, 0.08]
+BRAND = [f"Brand {i}" for i in range(500)]
+
+
+def lokasi_names() -> np.ndarray:
+    district = wilayah.load_district_ref()["DISTRICT"].to_numpy()
+    return np.array([d if d.startswith("Kota ") else f"Kab. {d}" for d in district])
+
+
+def province_names() -> np.ndarray:
+    return wilayah.load_district_ref()["PROVINCE"].unique()
+
+
+def _price(rng, n):
+    price = rng.lognormal(mean=12, sigma=1.2, size=n).round()
+    price[rng.random(n) < 0.01] = 0   # sebagian harga kosong/0
+    return price
+
+
+def iter_raw(n_rows, chunksize=500_000, seed=0):
+    # Per chunk supaya 10^7 baris bisa ditulis tanpa memuat semuanya
+    rng = np.random.default_rng(seed)
+    lokasi = lokasi_names()
+
+    for mulai in range(0, n_rows, chunksize):
+        n = min(chunksize, n_rows - mulai)
+        nomor = np.arange(mulai, mulai + n)
+        yield pd.DataFrame({
+            "PRODUCT LINK": [f"https://contoh.id/p/{i}" for i in nomor],
+            "TITLE": [f"Produk {i}" for i in nomor],
+            "PRICE": _price(rng, n),
+            "MARKETPLACE": rng.choice(MARKETPLACE, size=n),
+            "BRAND": rng.choice(BRAND, size=n),
+            "ASAL BRAND": rng.choice(ASAL_BRAND, size=n, p=ASAL_BOBOT),
+            "Kategori": rng.choice(KATEGORI, size=n),
+            "LOCATION": rng.choice(lokasi, size=n),
+        }, index=nomor)
+
+
+def raw_listings(n_rows, seed=0) -> pd.DataFrame:
+    return pd.concat(iter_raw(n_rows, seed=seed))
+
+
+def write_raw(path, n_rows, chunksize=500_000, seed=0):
+    # Format dari ekstensi: .csv ditulis bertahap, .parquet per row group
+    path = str(path)
+    if path.endswith(".csv"):
+        for i, chunk in enumerate(iter_raw(n_rows, chunksize, seed)):
+            chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        return
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    writer = None
+    for chunk in iter_raw(n_rows, chunksize, seed):
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(path, table.schema)
+        writer.write_table(table)
+    writer.close()
+
+
+def listings(n_rows, seed=0) -> pd.DataFrame:
+    # Frame ringkas (kategorikal + is_local + PRICE float32) tanpa kolom teks,
+    # untuk benchmark agregasi yang tidak perlu lewat pembersihan
+    rng = np.random.default_rng(seed)
+    bobot = np.array(ASAL_BOBOT[:-1]) / sum(ASAL_BOBOT[:-1])   # '-' sudah dibuang
+    asal = rng.choice(ASAL_BRAND[:-1], size=n_rows, p=bobot)
+    return pd.DataFrame({
+        "MARKETPLACE": pd.Categorical(rng.choice(MARKETPLACE, size=n_rows)),
+        "PROVINCE": pd.Categorical(rng.choice(province_names(), size=n_rows)),
+        "Kategori": pd.Categorical(rng.choice(KATEGORI, size=n_rows)),
+        "ASAL BRAND": pd.Categorical(asal),
+        "is_local": asal == "ID",
+        "PRICE": _price(rng, n_rows).astype("float32"),
+    })
@@ -0,0 +1,38 @@
+# Paket inti dashboard monitoring produk lokal (tanpa Streamlit)
+from importlib import import_module
+
+from . import analytics
+from .cube import build_cube
+from .format import fmt_rupiah
+from .insights import Insights
+from .stats import gmean, grouped_gmean
+
+# loader -> lokasi -> wilayah baru diimport saat pertama dipakai: lokasi dan
+# wilayah juga dijalankan sebagai CLI (python -m produk_lokal.wilayah build),
+# dan runpy memperingatkan kalau modul itu sudah ada di sys.modules
+_LAZY = {
+    "load_listings": "loader",
+    "source_fingerprint": "loader",
+    "normalize_lokasi": "lokasi",
+    "resolve_lokasi": "lokasi",
+}
+
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(f".{_LAZY[name]}", __name__), name)
+
+
+__all__ = [
+    "Insights",
+    "analytics",
+    "build_cube",
+    "fmt_rupiah",
+    "gmean",
+    "grouped_gmean",
+    "load_listings",
+    "normalize_lokasi",
+    "resolve_lokasi",
+    "source_fingerprint",
+]
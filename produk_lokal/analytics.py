@@ -0,0 +1,110 @@
+# ---- Analitik inti (tanpa Streamlit) ----
+# Semua angka yang ditampilkan dashboard, sebagai fungsi biasa. Argumen `data`
+# boleh berupa frame listing hasil load_listings/ingest.read_store (cube dibangun
+# dulu) atau cube yang sudah jadi (dipakai dashboard supaya tidak scan ulang).
+# Dipakai juga oleh job batch dan benchmark.
+import numpy as np
+import pandas as pd
+
+from . import cube as agg
+
+
+def as_cube(data: pd.DataFrame) -> pd.DataFrame:
+    if set(agg.UKURAN).issubset(data.columns):
+        return data
+    return agg.build_cube(data)
+
+
+# ---- Dominasi produk ----
+
+def lokal_impor_share(data, marketplace=None) -> dict:
+    # Jumlah dan persentase produk lokal vs impor (opsional per marketplace)
+    jumlah = agg.lokal_impor_counts(as_cube(data), marketplace=marketplace)
+    total = jumlah["Lokal"] + jumlah["Impor"]
+    return {
+        "lokal": jumlah["Lokal"],
+        "impor": jumlah["Impor"],
+        "total": total,
+        "persen_lokal": jumlah["Lokal"] / total * 100 if total > 0 else 0,
+        "persen_impor": jumlah["Impor"] / total * 100 if total > 0 else 0,
+    }
+
+
+def kategori_counts(data, marketplace=None, provinsi=None, produk="Lokal") -> pd.DataFrame:
+    return agg.kategori_counts(as_cube(data), marketplace=marketplace,
+                               provinsi=provinsi, produk=produk)
+
+
+# ---- Sebaran lokasi ----
+
+def provinsi_counts(data, produk="Lokal") -> pd.DataFrame:
+    return agg.provinsi_counts(as_cube(data), produk=produk)
+
+
+def kabupaten_counts(df: pd.DataFrame, provinsi=None, produk="Lokal") -> pd.DataFrame:
+    # Jumlah penjual per kabupaten/kota (butuh frame listing, cube tidak
+    # menyimpan DISTRICT); kolom DISTRICT / count
+    mask = np.ones(len(df), dtype=bool)
+    if provinsi is not None:
+        mask &= (df["PROVINCE"] == provinsi).to_numpy()
+    if produk is not None:
+        mask &= (agg.jenis_produk(df) == produk)
+    count = df.loc[mask, "DISTRICT"].value_counts()
+    return count[count > 0].rename_axis("DISTRICT").reset_index(name="count")
+
+
+def top_provinsi(data) -> dict:
+    # Provinsi dengan penjual produk lokal terbanyak dan kategori teratasnya
+    cube = as_cube(data)
+    count = agg.provinsi_counts(cube, produk="Lokal")
+    if count.empty:
+        return None
+
+    top_prov = count.sort_values("count", ascending=False).iloc[0]
+    kategori_count = agg.kategori_counts(cube, provinsi=top_prov["PROVINCE"], produk="Lokal")
+    if not kategori_count.empty:
+        top_kat_name = kategori_count.iloc[0]["Kategori"]
+        top_kat_count = int(kategori_count.iloc[0]["Jumlah Produk"])
+    else:
+        top_kat_name, top_kat_count = "-", 0
+
+    return {
+        "provinsi": top_prov["PROVINCE"],
+        "jumlah": int(top_prov["count"]),
+        "kategori": top_kat_name,
+        "jumlah_kategori": top_kat_count,
+    }
+
+
+# ---- Analisis harga ----
+
+def gmean_per_kategori(data) -> pd.DataFrame:
+    # Rata-rata geometrik harga per kategori & produk (kolom 'Mean Price')
+    return agg.gmean_table(as_cube(data), by=("Kategori", "Produk"))
+
+
+def gmean_extremes(data) -> dict:
+    # Baris rata-rata geometrik tertinggi dan terendah dari gmean_per_kategori
+    grouped_price = gmean_per_kategori(data)
+    max_row = grouped_price.loc[grouped_price['Mean Price'].idxmax()]
+    min_row = grouped_price.loc[grouped_price['Mean Price'].idxmin()]
+    return {"max": max_row.to_dict(), "min": min_row.to_dict()}
+
+
+def gmean_lokal_impor(data, kategori=None, provinsi=None) -> dict:
+    # Rata-rata geometrik harga lokal dan impor (0 kalau tidak ada data)
+    return agg.gmean_produk(as_cube(data), kategori=kategori, provinsi=provinsi)
+
+
+def price_insight(mean_lokal, mean_impor) -> str:
+    if mean_lokal < mean_impor and mean_lokal > 0:
+        return (
+            "Produk impor umumnya berada pada kisaran harga yang lebih tinggi, sementara produk lokal cenderung lebih terjangkau."
+        )
+    elif mean_lokal > mean_impor and mean_impor > 0:
+        return (
+            "Produk lokal justru memiliki rata-rata harga lebih tinggi dibandingkan produk impor, menunjukkan adanya segmen premium pada produk dalam negeri."
+        )
+    return (
+        "Harga produk lokal dan impor relatif seimbang, menunjukkan persaingan yang cukup setara di pasar e-commerce."
+    )
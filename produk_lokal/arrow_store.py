@@ -0,0 +1,83 @@
+# ---- Tabel Arrow bersama (memory-mapped) ----
+# Beberapa proses Streamlit di belakang load balancer tidak perlu memegang
+# salinan df masing-masing: tabel listing bersih ditulis sekali per versi data
+# sebagai file Arrow IPC tanpa kompresi, lalu tiap worker membukanya lewat
+# memory map read-only. Buffer kolom berada di page cache OS dan dipakai
+# bersama semua proses. Filter tidak dievaluasi di tabel ini: tiap worker
+# memegang bitmap FilterIndex (filters.py) sendiri, lalu hanya mengambil
+# baris dan kolom yang lolos dari tabel bersama.
+#
+#   <ARROW_DIR>/listings-<versi>.arrow
+#
+# Worker pertama yang tidak menemukan file untuk versi aktif menulisnya
+# (tmp + rename, aman kalau beberapa worker menulis bersamaan).
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from . import config
+from .cache import shared_cache
+from .profiling import span
+
+META_KEY = b"produk_lokal"
+
+
+def arrow_path(versi, arrow_dir=config.ARROW_DIR) -> Path:
+    return Path(arrow_dir) / f"listings-{versi}.arrow"
+
+
+def write_table(df: pd.DataFrame, path: Path):
+    # df.attrs (ringkasan kualitas lokasi) ikut disimpan di metadata skema
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[META_KEY] = json.dumps(df.attrs, default=str).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with pa.OSFile(str(tmp_path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+
+    # File versi lama dihapus; worker yang masih me-map-nya tetap bisa membaca
+    # sampai map ditutup (inode baru dilepas setelah itu)
+    for lama in path.parent.glob("listings-*.arrow"):
+        if lama != path:
+            lama.unlink(missing_ok=True)
+
+
+def open_table(path) -> pa.Table:
+    # Zero-copy: kolom tabel menunjuk langsung ke halaman file yang di-map
+    source = pa.memory_map(str(path), "r")
+    return pa.ipc.open_file(source).read_all()
+
+
+def shared_listings(versi, load, arrow_dir=config.ARROW_DIR) -> pa.Table:
+    # load() hanya dipanggil kalau file untuk versi ini belum ada; frame-nya
+    # tidak disimpan, jadi worker hanya memegang tabel yang di-map.
+    # Ukuran entri di shared_cache hanya objek Table (buffer ada di page cache)
+    path = arrow_path(versi, arrow_dir)
+
+    def buka():
+        if not path.exists():
+            with span("arrow.write"):
+                write_table(load(), path)
+        with span("arrow.mmap"):
+            return open_table(path)
+
+    return shared_cache.get_or_compute(("arrow", str(path)), buka, versi=versi)
+
+
+def table_attrs(table: pa.Table) -> dict:
+    metadata = table.schema.metadata or {}
+    return json.loads(metadata[META_KEY]) if META_KEY in metadata else {}
+
+
+def to_frame(table: pa.Table, columns=None) -> pd.DataFrame:
+    # Salinan pandas sementara, hanya untuk kolom yang dibutuhkan
+    if columns is not None:
+        table = table.select(columns)
+    return table.to_pandas()
@@ -0,0 +1,57 @@
+# ---- Statistik boxplot ----
+# Kuartil, whisker (Tukey 1.5 x IQR), batas sumbu q95 dan titik outlier per
+# irisan filter dan per Lokal/Impor, diambil dari gabungan sketch kuantil per
+# sel cube (sketch.py), bukan dari sort baris harga. Biaya query sebanding
+# jumlah sel x bucket, tidak ikut jumlah baris; galat relatif <= sketch.ALPHA.
+# Figure hanya berisi ringkasan statistik, bukan semua titik harga.
+import numpy as np
+
+from .profiling import traced
+from .sketch import SketchIndex, histogram_quantiles
+
+# Batas jumlah titik outlier per kotak yang dikirim ke browser
+MAX_OUTLIER = 200
+
+
+def histogram_stats(values, count, max_outliers=MAX_OUTLIER, seed=0) -> dict:
+    # Ringkasan satu kotak dari histogram sketch (nilai bucket, jumlah)
+    q1, median, q3 = histogram_quantiles(values, count, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    batas_bawah, batas_atas = q1 - 1.5 * iqr, q3 + 1.5 * iqr
+
+    # Whisker berhenti di bucket terjauh yang masih di dalam batas; outlier
+    # satu titik per bucket terisi di luar batas
+    terisi = values[count > 0]
+    dalam = terisi[(terisi >= batas_bawah) & (terisi <= batas_atas)]
+    outliers = terisi[(terisi < batas_bawah) | (terisi > batas_atas)]
+    if len(outliers) > max_outliers:
+        rng = np.random.default_rng(seed)
+        outliers = np.sort(rng.choice(outliers, max_outliers, replace=False))
+
+    return {
+        "n": int(count.sum()),
+        "q1": float(q1),
+        "median": float(median),
+        "q3": float(q3),
+        "lowerfence": float(dalam[0]),
+        "upperfence": float(dalam[-1]),
+        "outliers": outliers,
+    }
+
+
+@traced("boxplot.stats")
+def box_summary(sketches: SketchIndex, kategori=None, provinsi=None, max_outliers=MAX_OUTLIER):
+    # {"q95": float, "produk": {"Lokal": stats, "Impor": stats}} untuk satu
+    # irisan data, atau None kalau irisan kosong
+    hist = {produk: sketches.histogram(kategori=kategori, provinsi=provinsi, produk=produk)
+            for produk in ("Lokal", "Impor")}
+    total = hist["Lokal"] + hist["Impor"]
+    if total.sum() == 0:
+        return None
+    return {
+        "q95": float(histogram_quantiles(sketches.values, total, [0.95])[0]),
+        "produk": {
+            produk: histogram_stats(sketches.values, count, max_outliers)
+            for produk, count in hist.items() if count.sum() > 0
+        },
+    }
@@ -0,0 +1,151 @@
+# ---- Cache bersama (per proses) ----
+# Satu cache untuk semua sesi Streamlit di proses yang sama: frame hasil load,
+# GeoJSON, cube dan tabel turunan per kombinasi filter. LRU dengan batas ukuran
+# (MB) dan TTL. Entri yang bergantung pada data diberi `versi`, dan versi ikut
+# jadi bagian key: sesi yang masih memakai snapshot lama tidak membuang entri
+# versi baru (dan sebaliknya). Saat snapshot baru dipasang, refresher memanggil
+# on_source_change(versi_baru): entri versi lain dibuang dan versi lama tidak
+# disimpan lagi walaupun masih dihitung oleh sesi lama.
+import json
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from . import config
+
+
+def _sizeof(value) -> int:
+    # Perkiraan ukuran di memori (byte), cukup untuk batas kapasitas
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    if isinstance(value, dict):
+        return len(json.dumps(value, default=str))
+    if isinstance(value, (list, tuple)):
+        return sum(_sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class _Entry:
+    __slots__ = ("value", "size", "versi", "expires")
+
+    def __init__(self, value, size, versi, expires):
+        self.value = value
+        self.size = size
+        self.versi = versi
+        self.expires = expires
+
+
+class SharedCache:
+    def __init__(self, max_mb=config.CACHE_MAX_MB, ttl=config.CACHE_TTL):
+        self.max_bytes = int(max_mb * 1024 ** 2)
+        self.ttl = ttl
+        self.versi = None
+        self._retired = set()     # versi lama yang tidak boleh masuk cache lagi
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._size -= entry.size
+
+    def _lookup(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires < time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def get_or_compute(self, key, compute, versi=None):
+        with self._lock:
+            entry = self._lookup((key, versi))
+            if entry is not None:
+                self.hits += 1
+                return entry.value
+            key_lock = self._key_locks.setdefault((key, versi), threading.Lock())
+
+        # Satu sesi menghitung, sesi lain dengan key yang sama menunggu hasilnya
+        with key_lock:
+            with self._lock:
+                entry = self._lookup((key, versi))
+                if entry is not None:
+                    self.hits += 1
+                    return entry.value
+                self.misses += 1
+
+            value = compute()
+            self.put(key, value, versi)
+            return value
+
+    def put(self, key, value, versi=None):
+        size = _sizeof(value)
+        key = (key, versi)
+        with self._lock:
+            # Sesi lama masih boleh menghitung, tapi hasilnya tidak disimpan
+            if versi is not None and versi in self._retired:
+                return
+            if key in self._entries:
+                self._drop(key)
+            # Nilai yang lebih besar dari kapasitas tidak disimpan
+            if size > self.max_bytes:
+                return
+            self._entries[key] = _Entry(value, size, versi, time.monotonic() + self.ttl)
+            self._size += size
+            while self._size > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, predicate=None):
+        # Buang semua entri, atau hanya yang key-nya memenuhi predicate
+        with self._lock:
+            for key in [k for k in self._entries if predicate is None or predicate(k[0])]:
+                self._drop(key)
+
+    def on_source_change(self, versi):
+        # Dipanggil refresher saat snapshot versi baru dipasang: versi sebelumnya
+        # dipensiunkan dan entri dari versi data lain dibuang
+        with self._lock:
+            if versi == self.versi:
+                return
+            if self.versi is not None:
+                self._retired.add(self.versi)
+            self._retired.discard(versi)
+            self.versi = versi
+            for key in [k for k, e in self._entries.items()
+                        if e.versi is not None and e.versi != versi]:
+                self._drop(key)
+            for key in [k for k in self._key_locks if k[1] is not None and k[1] != versi]:
+                del self._key_locks[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "size_mb": self._size / 1024 ** 2,
+                "max_mb": self.max_bytes / 1024 ** 2,
+            }
+
+
+shared_cache = SharedCache()
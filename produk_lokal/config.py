@@ -0,0 +1,50 @@
+# ---- Lokasi file data ----
+import os
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+
+DATA_PATH = Path(os.environ.get(
+    "PRODUK_LOKAL_DATA", ROOT_DIR / "Identifikasi-Brand-E-Commerce.xlsx"))
+
+SHP_DIR = ROOT_DIR / "idn_adm_bps_20200401_shp"
+ADM1_PATH = SHP_DIR / "idn_admbnda_adm1_bps_20200401.shp"
+ADM2_PATH = SHP_DIR / "idn_admbnda_adm2_bps_20200401.shp"
+
+# Cache hasil pembersihan data (Parquet)
+CACHE_DIR = Path(os.environ.get(
+    "PRODUK_LOKAL_CACHE", ROOT_DIR / ".cache" / "produk_lokal"))
+
+# Tabel listing bersih sebagai Arrow IPC yang di-memory-map semua worker
+# (lihat arrow_store.py); harus di filesystem yang sama untuk semua proses
+ARROW_DIR = Path(os.environ.get("PRODUK_LOKAL_ARROW", CACHE_DIR / "arrow"))
+
+# Cache bersama antar sesi (lihat cache.py)
+CACHE_MAX_MB = float(os.environ.get("PRODUK_LOKAL_CACHE_MB", 512))
+CACHE_TTL = float(os.environ.get("PRODUK_LOKAL_CACHE_TTL", 3600))
+
+# Store inkremental (batch scrape harian, dipartisi per tanggal & marketplace)
+STORE_DIR = Path(os.environ.get("PRODUK_LOKAL_STORE", ROOT_DIR / "store"))
+
+# Aset turunan (GeoJSON yang sudah disederhanakan, tabel referensi)
+ASSET_DIR = ROOT_DIR / "assets"
+
+# File statis yang dilayani Streamlit di app/static/ (server.enableStaticServing
+# di .streamlit/config.toml); folder harus di samping streamlit-app.py
+STATIC_DIR = ROOT_DIR / "static"
+STATIC_URL = "app/static"
+
+# Peta: "url" = GeoJSON dirujuk lewat URL statis (diambil browser sekali lalu
+# di-cache), "inline" = GeoJSON ditanam di setiap figure
+GEOJSON_MODE = os.environ.get("PRODUK_LOKAL_GEOJSON", "url")
+
+# Batas total ukuran spec chart yang dikirim per interaksi (lihat figures.py)
+PAYLOAD_MAX_KB = float(os.environ.get("PRODUK_LOKAL_PAYLOAD_KB", 4096))
+
+# Interval (detik) refresher latar belakang memeriksa sumber data (lihat
+# snapshot.py); 0 = periksa di tiap rerun tanpa thread
+REFRESH_INTERVAL = float(os.environ.get("PRODUK_LOKAL_REFRESH", 30))
+
+# Instrumentasi hot path (lihat profiling.py): nonaktif kecuali di-set
+PROFILE = os.environ.get("PRODUK_LOKAL_PROFILE", "").lower() in ("1", "true", "yes")
+PROFILE_LOG = os.environ.get("PRODUK_LOKAL_PROFILE_LOG")   # file JSON Lines per rerun
@@ -0,0 +1,90 @@
+# ---- Agregat (cube) ----
+# Dihitung sekali saat data dimuat: jumlah produk, jumlah log-harga dan jumlah
+# harga positif per (MARKETPLACE x PROVINCE x Kategori x Lokal/Impor).
+# Semua widget cukup mengiris cube ini, tidak perlu groupby ulang di df penuh.
+import numpy as np
+import pandas as pd
+
+from .profiling import traced
+from .stats import gmean_from_sums, log_price
+
+DIMENSI = ["MARKETPLACE", "PROVINCE", "Kategori", "Produk"]
+UKURAN = ["n", "log_sum", "n_pos"]
+
+
+def jenis_produk(df: pd.DataFrame) -> np.ndarray:
+    # Label asal produk: 'Lokal' kalau ASAL BRAND == 'ID', selain itu 'Impor'
+    is_local = df["is_local"] if "is_local" in df else df["ASAL BRAND"] == "ID"
+    return np.where(is_local, "Lokal", "Impor")
+
+
+@traced("cube.build")
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    log, positif = log_price(df["PRICE"])
+
+    frame = pd.DataFrame({
+        "MARKETPLACE": df["MARKETPLACE"].to_numpy(),
+        "PROVINCE": df["PROVINCE"].to_numpy(),
+        "Kategori": df["Kategori"].to_numpy(),
+        "Produk": jenis_produk(df),
+        "n": 1,
+        "log_sum": log,
+        "n_pos": positif.astype("int64"),
+    })
+    return frame.groupby(DIMENSI, sort=False, observed=True)[UKURAN].sum().reset_index()
+
+
+def merge_cubes(*cubes) -> pd.DataFrame:
+    # Gabungkan cube (mis. cube lama + cube dari batch baru) tanpa menghitung
+    # ulang dari baris mentah
+    gabungan = pd.concat(cubes, ignore_index=True)
+    gabungan = gabungan.astype({kolom: "str" for kolom in DIMENSI})
+    return gabungan.groupby(DIMENSI, sort=False)[UKURAN].sum().reset_index()
+
+
+def slice_cube(cube, marketplace=None, provinsi=None, kategori=None, produk=None):
+    # None berarti semua nilai
+    mask = np.ones(len(cube), dtype=bool)
+    for kolom, nilai in (("MARKETPLACE", marketplace), ("PROVINCE", provinsi),
+                         ("Kategori", kategori), ("Produk", produk)):
+        if nilai is not None:
+            mask &= (cube[kolom] == nilai).to_numpy()
+    return cube[mask]
+
+
+# ---- Query ----
+
+def lokal_impor_counts(cube, **filter) -> dict:
+    jumlah = slice_cube(cube, **filter).groupby("Produk", observed=True)["n"].sum()
+    return {"Lokal": int(jumlah.get("Lokal", 0)), "Impor": int(jumlah.get("Impor", 0))}
+
+
+def kategori_counts(cube, **filter) -> pd.DataFrame:
+    return (
+        slice_cube(cube, **filter)
+        .groupby("Kategori", observed=True)["n"].sum()
+        .sort_values(ascending=False)
+        .reset_index(name="Jumlah Produk")
+    )
+
+
+def provinsi_counts(cube, **filter) -> pd.DataFrame:
+    return (
+        slice_cube(cube, **filter)
+        .groupby("PROVINCE", observed=True)["n"].sum()
+        .reset_index(name="count")
+    )
+
+
+def gmean_table(cube, by=("Kategori", "Produk"), **filter) -> pd.DataFrame:
+    grup = slice_cube(cube, **filter).groupby(list(by), observed=True)[["log_sum", "n_pos"]].sum()
+    return pd.DataFrame(
+        {"Mean Price": gmean_from_sums(grup["log_sum"], grup["n_pos"])},
+        index=grup.index,
+    ).reset_index()
+
+
+def gmean_produk(cube, **filter) -> dict:
+    # Rata-rata geometrik harga lokal dan impor untuk satu irisan cube
+    tabel = gmean_table(cube, by=("Produk",), **filter).set_index("Produk")["Mean Price"]
+    return {"Lokal": float(tabel.get("Lokal", 0)), "Impor": float(tabel.get("Impor", 0))}
@@ -0,0 +1,130 @@
+# ---- Cache spec chart & batas payload per interaksi ----
+# Figure Altair/Plotly dibangun dan diserialisasi sekali per (jenis chart,
+# filter, tema warna) per versi data, lalu dipakai ulang semua sesi dari cache
+# bersama. Spec yang identik antar rerun juga membuat Streamlit bisa memakai
+# cache pesan di browser (pesan besar yang sama tidak dikirim ulang).
+#
+# Ukuran tiap spec (byte JSON) dicatat per interaksi, yaitu satu rerun penuh
+# atau satu rerun fragment. Kalau total melewati batas (PRODUK_LOKAL_PAYLOAD_KB),
+# chart berikutnya tidak dikirim.
+#
+#   spec = figures.altair_spec(("donut",), buat_chart, versi=versi_data)
+#   if figures.allow("donut", spec.nbytes):
+#       st.vega_lite_chart(spec=spec.copy(), use_container_width=True)
+import json
+import threading
+from functools import wraps
+
+import pandas as pd
+
+from . import config
+from .cache import shared_cache
+
+_lokal = threading.local()
+
+
+class Spec:
+    def __init__(self, obj, nbytes):
+        self.obj = obj            # dict Vega-Lite atau plotly.graph_objects.Figure
+        self.nbytes = nbytes      # ukuran JSON yang dikirim ke browser
+
+    def copy(self):
+        # st.vega_lite_chart memindahkan "datasets" keluar dari dict spec
+        return dict(self.obj)
+
+    def __sizeof__(self):
+        # Dipakai shared_cache (sys.getsizeof) untuk batas kapasitas
+        return self.nbytes
+
+
+def _altair_dict(chart) -> dict:
+    import altair as alt
+
+    spec = chart.to_dict()
+    # Tema default Altair menambah ukuran view 300x300; st.altair_chart
+    # mematikan tema itu, jadi spec yang di-cache juga tanpa config tersebut
+    if alt.theme.active == "default" and spec.get("config") == alt.theme.get()().get("config"):
+        spec.pop("config")
+    return spec
+
+
+def altair_spec(key, build, versi=None) -> Spec:
+    # build() -> alt.Chart; validasi skema + to_dict hanya saat cache miss
+    def buat():
+        spec = _altair_dict(build())
+        return Spec(spec, len(json.dumps(spec, default=str)))
+
+    return shared_cache.get_or_compute(("figure",) + tuple(key), buat, versi=versi)
+
+
+def plotly_figure(key, build, versi=None) -> Spec:
+    # build() -> go.Figure; px.* (yang lambat) hanya dipanggil saat cache miss
+    def buat():
+        fig = build()
+        return Spec(fig, len(fig.to_json(validate=False)))
+
+    return shared_cache.get_or_compute(("figure",) + tuple(key), buat, versi=versi)
+
+
+# ---- Payload per interaksi ----
+
+class Interaction:
+    def __init__(self, label, limit):
+        self.label = label
+        self.limit = limit
+        self.charts = []          # (nama, byte, dikirim)
+
+    @property
+    def sent(self) -> int:
+        return sum(nbytes for _, nbytes, dikirim in self.charts if dikirim)
+
+    def allow(self, name, nbytes) -> bool:
+        dikirim = self.sent + nbytes <= self.limit
+        self.charts.append((name, nbytes, dikirim))
+        return dikirim
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "Chart": [nama for nama, _, _ in self.charts],
+            "KB": [round(nbytes / 1024, 1) for _, nbytes, _ in self.charts],
+            "Dikirim": [dikirim for _, _, dikirim in self.charts],
+        })
+
+
+def begin_interaction(label, limit=None) -> Interaction:
+    limit = config.PAYLOAD_MAX_KB * 1024 if limit is None else limit
+    _lokal.interaction = Interaction(label, limit)
+    return _lokal.interaction
+
+
+def end_interaction():
+    interaction = current_interaction()
+    _lokal.interaction = None
+    return interaction
+
+
+def current_interaction():
+    return getattr(_lokal, "interaction", None)
+
+
+def interaction(label):
+    # Untuk fragment: rerun fragment saja = interaksi sendiri; di dalam rerun
+    # penuh ikut dihitung di interaksi script
+    def dekorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if current_interaction() is not None:
+                return fn(*args, **kwargs)
+            begin_interaction(label)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                end_interaction()
+        return wrapper
+    return dekorator
+
+
+def allow(name, nbytes) -> bool:
+    # Tanpa interaksi aktif (mis. benchmark) semua chart boleh
+    interaction = current_interaction()
+    return True if interaction is None else interaction.allow(name, nbytes)
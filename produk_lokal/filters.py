@@ -0,0 +1,123 @@
+# ---- Filter engine (bitmap per nilai) ----
+# Dibangun sekali per versi data dari tabel listing: untuk tiap dimensi filter
+# (marketplace, kategori, provinsi, asal brand, Lokal/Impor) dan tiap nilainya
+# disimpan bitmap baris (array bool yang di-pack, 1 bit per baris). Kombinasi
+# filter apa pun (beberapa nilai per dimensi = OR, antar dimensi = AND) dijawab
+# dengan operasi bit, tanpa scan ulang kolom. Daftar pilihan widget juga
+# diambil dari sini, bukan ditulis manual.
+#
+# Bitmap adalah memori privat tiap worker (1 bit per baris per nilai), jadi
+# hanya dimensi yang dipakai dashboard (EAGER) yang dibangun di awal. Dimensi
+# lain (mis. ASAL BRAND, puluhan nilai) baru dibangun saat pertama dipakai.
+#
+#   index = FilterIndex(tabel)
+#   index.options("kategori")
+#   index.count(provinsi="Jawa Barat", produk="Lokal")
+#   index.take(tabel, kategori=["Fashion & Aksesoris", "Lain-Lain"], marketplace="OLX")
+import threading
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from .profiling import traced
+
+# Argumen filter -> kolom data
+DIMENSI = {
+    "marketplace": "MARKETPLACE",
+    "kategori": "Kategori",
+    "provinsi": "PROVINCE",
+    "asal_brand": "ASAL BRAND",
+}
+
+# Dimensi yang difilter/ditampilkan dashboard
+EAGER = ("marketplace", "kategori", "provinsi")
+
+# Jumlah bit 1 untuk tiap nilai byte
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _codes(data, kolom):
+    # (kode per baris, daftar nilai) dari tabel Arrow atau DataFrame
+    seri = data.column(kolom).to_pandas() if isinstance(data, pa.Table) else data[kolom]
+    seri = seri.astype("category")
+    return seri.cat.codes.to_numpy(), list(seri.cat.categories)
+
+
+class FilterIndex:
+    @traced("filters.build")
+    def __init__(self, data, eager=EAGER):
+        self.n = data.num_rows if isinstance(data, pa.Table) else len(data)
+        self._data = data         # untuk dimensi lazy; tabel Arrow di-map, bukan salinan
+        self._bitmaps = {}
+        self._lock = threading.Lock()
+
+        for dim in eager:
+            self._build(dim)
+
+        lokal = data.column("is_local").to_numpy() if isinstance(data, pa.Table) \
+            else data["is_local"].to_numpy()
+        self._bitmaps["produk"] = {"Lokal": np.packbits(lokal), "Impor": np.packbits(~lokal)}
+
+        self._semua = np.packbits(np.ones(self.n, dtype=bool))
+
+    def _build(self, dim):
+        kode, nilai = _codes(self._data, DIMENSI[dim])
+        self._bitmaps[dim] = {v: np.packbits(kode == i) for i, v in enumerate(nilai)}
+
+    def _dim(self, dim) -> dict:
+        bitmaps = self._bitmaps.get(dim)
+        if bitmaps is None:
+            with self._lock:
+                if dim not in self._bitmaps:
+                    self._build(dim)
+            bitmaps = self._bitmaps[dim]
+        return bitmaps
+
+    @property
+    def nbytes(self) -> int:
+        return sum(b.nbytes for bitmaps in list(self._bitmaps.values()) for b in bitmaps.values())
+
+    def options(self, dim) -> list:
+        # Nilai yang benar-benar ada di data (kategori kosong tidak ikut)
+        return [v for v, bits in self._dim(dim).items() if bits.any()]
+
+    def bitmap(self, **filter) -> np.ndarray:
+        # None berarti semua nilai; list berarti salah satu dari nilai tersebut
+        hasil = self._semua
+        for dim, nilai in filter.items():
+            if nilai is None:
+                continue
+            bitmaps = self._dim(dim)
+            if isinstance(nilai, (list, tuple, set)):
+                kosong = np.zeros_like(self._semua)
+                pilih = np.bitwise_or.reduce([bitmaps.get(v, kosong) for v in nilai] or [kosong])
+            else:
+                pilih = bitmaps.get(nilai)
+                if pilih is None:
+                    pilih = np.zeros_like(self._semua)
+            hasil = hasil & pilih
+        return hasil
+
+    def count(self, **filter) -> int:
+        return int(_POPCOUNT[self.bitmap(**filter)].sum(dtype="int64"))
+
+    def rows(self, **filter) -> np.ndarray:
+        # Posisi baris yang lolos filter (urut naik)
+        return np.flatnonzero(np.unpackbits(self.bitmap(**filter), count=self.n))
+
+    def take(self, table: pa.Table, columns=None, **filter) -> pa.Table:
+        if columns is not None:
+            table = table.select(columns)
+        if all(nilai is None for nilai in filter.values()):
+            return table
+        return table.take(self.rows(**filter))
+
+    def counts_by(self, dim, **filter) -> pd.Series:
+        # Jumlah baris per nilai `dim` di dalam filter (cross-filter: mis. klik
+        # provinsi -> jumlah per kategori), terurut menurun, nilai kosong dibuang
+        dasar = self.bitmap(**filter)
+        jumlah = {v: int(_POPCOUNT[dasar & bits].sum(dtype="int64"))
+                  for v, bits in self._dim(dim).items()}
+        seri = pd.Series(jumlah, dtype="int64")
+        return seri[seri > 0].sort_values(ascending=False, kind="stable")
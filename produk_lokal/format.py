@@ -0,0 +1,11 @@
+# ---- Format angka jadi Rupiah ----
+from functools import lru_cache
+
+from babel.numbers import format_currency
+
+
+# Babel memuat data locale dan mem-parse pola tiap panggilan; nilai yang sama
+# (rata-rata per kategori/provinsi) diformat berulang kali di tiap rerun
+@lru_cache(maxsize=4096)
+def fmt_rupiah(val):
+    return format_currency(val, "IDR", locale="id_ID") if val else "–"
@@ -0,0 +1,236 @@
+# ---- Aset peta provinsi & kabupaten/kota ----
+# Poligon provinsi disederhanakan dan dibulatkan koordinatnya sekali (build
+# step), lalu disimpan sebagai GeoJSON kecil per tingkat toleransi. Dashboard
+# hanya membaca file JSON ini, dan baru saat peta benar-benar ditampilkan.
+#
+# Poligon kabupaten/kota (ADM2) dipartisi per provinsi: satu GeoJSON per
+# provinsi plus _index.json (nama/kode provinsi -> file aset).
+# Drill-down hanya membaca dan mengirim geometri provinsi yang diklik.
+#
+# Untuk peta mode "url", file aset disalin ke folder static Streamlit dan
+# figure hanya memuat URL-nya; browser mengambil GeoJSON sekali lalu memakai
+# cache HTTP (ETag) untuk rerun berikutnya.
+#
+# Build ulang aset (butuh shapefile ADM1/ADM2 lengkap):
+#   python -m produk_lokal.geo build [--level adm1|adm2|semua]
+import argparse
+import json
+import os
+import shutil
+from pathlib import Path
+
+from . import config
+from .cache import shared_cache
+from .profiling import span
+
+# Toleransi simplify (derajat) -> label di dashboard
+TOLERANSI = {
+    0.005: "Detail",
+    0.01: "Sedang",
+    0.05: "Ringan",
+}
+DEFAULT_TOLERANSI = 0.01
+
+# Jumlah digit desimal koordinat (3 digit ~ 100 m)
+PRESISI = 3
+
+KOLOM_PROVINSI = ["ADM1_EN", "ADM1_PCODE"]
+KOLOM_KABUPATEN = ["ADM2_EN", "ADM2_PCODE", "ADM1_EN", "ADM1_PCODE"]
+
+# Poligon kabupaten/kota dilihat dari dekat (satu provinsi), jadi satu tingkat detail saja
+TOLERANSI_KABUPATEN = 0.005
+INDEX_KABUPATEN = "_index.json"
+
+
+def asset_path(tolerance, asset_dir=config.ASSET_DIR):
+    return asset_dir / f"provinsi_bps20200401_tol{tolerance:g}.geojson"
+
+
+def _require(src):
+    # Shapefile tidak ikut repo di semua checkout; beri pesan yang jelas
+    if not Path(src).exists():
+        raise FileNotFoundError(f"Shapefile tidak ditemukan: {src}")
+
+
+def build_province_assets(src=config.ADM1_PATH, asset_dir=config.ASSET_DIR,
+                          tolerances=tuple(TOLERANSI), precision=PRESISI):
+    # geopandas/shapely hanya dibutuhkan saat build
+    import geopandas as gpd
+    import shapely
+
+    _require(src)
+    with span("geo.read_shp"):
+        gdf = gpd.read_file(src)[KOLOM_PROVINSI + ["geometry"]]
+    asset_dir.mkdir(parents=True, exist_ok=True)
+
+    paths = []
+    for tolerance in tolerances:
+        simple = gdf.copy()
+        # simplify untuk kurangi kompleksitas poligon, lalu kuantisasi koordinat
+        with span("geo.simplify"):
+            simple["geometry"] = simple["geometry"].simplify(tolerance=tolerance, preserve_topology=True)
+            simple["geometry"] = shapely.set_precision(simple["geometry"].values, 10 ** -precision)
+
+        path = asset_path(tolerance, asset_dir)
+        simple.to_file(path, driver="GeoJSON", COORDINATE_PRECISION=precision)
+        paths.append(path)
+    return paths
+
+
+def load_province_geojson(tolerance=DEFAULT_TOLERANSI, asset_dir=config.ASSET_DIR) -> dict:
+    # Dibaca sekali per proses; kalau aset belum dibuat, build dari shapefile
+    def baca():
+        path = asset_path(tolerance, asset_dir)
+        if not path.exists():
+            build_province_assets(asset_dir=asset_dir, tolerances=(tolerance,))
+        with span("geo.read_geojson"), open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    return shared_cache.get_or_compute(("geojson", tolerance, str(asset_dir)), baca)
+
+
+def province_names(geojson) -> list:
+    return [feature["properties"]["ADM1_EN"] for feature in geojson["features"]]
+
+
+# ---- Kabupaten/kota per provinsi ----
+
+def district_asset_dir(asset_dir=config.ASSET_DIR) -> Path:
+    return Path(asset_dir) / "kabupaten_bps20200401"
+
+
+def build_district_assets(src=config.ADM2_PATH, asset_dir=config.ASSET_DIR,
+                          tolerance=TOLERANSI_KABUPATEN, precision=PRESISI):
+    import geopandas as gpd
+    import shapely
+
+    _require(src)
+    with span("geo.read_shp"):
+        gdf = gpd.read_file(src)[KOLOM_KABUPATEN + ["geometry"]]
+    with span("geo.simplify"):
+        gdf["geometry"] = gdf["geometry"].simplify(tolerance=tolerance, preserve_topology=True)
+        gdf["geometry"] = shapely.set_precision(gdf["geometry"].values, 10 ** -precision)
+
+    out_dir = district_asset_dir(asset_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    paths, index = [], []
+    for (provinsi, pcode), bagian in gdf.groupby(["ADM1_EN", "ADM1_PCODE"]):
+        path = out_dir / f"{pcode}.geojson"
+        bagian.to_file(path, driver="GeoJSON", COORDINATE_PRECISION=precision)
+        paths.append(path)
+        index.append({
+            "PROVINCE": provinsi,
+            "PROVINCE_PCODE": pcode,
+            "file": path.name,
+            "kabupaten": len(bagian),
+        })
+
+    # Index ditulis terakhir: aset dianggap ada kalau index-nya ada
+    with open(out_dir / INDEX_KABUPATEN, "w", encoding="utf-8") as f:
+        json.dump({"tolerance": tolerance, "provinsi": index}, f, ensure_ascii=False, indent=1)
+    return paths
+
+
+class DistrictIndex:
+    # Cari aset kabupaten per nama/kode provinsi tanpa membaca poligon sama sekali
+    def __init__(self, entries):
+        self.entries = entries
+        self._by_key = {}
+        for entry in entries:
+            self._by_key[entry["PROVINCE"]] = entry
+            self._by_key[entry["PROVINCE_PCODE"]] = entry
+
+    def lookup(self, provinsi):
+        return self._by_key.get(provinsi)
+
+
+def load_district_index(asset_dir=config.ASSET_DIR) -> DistrictIndex:
+    # Kalau aset belum ada, build dari shapefile ADM2 (FileNotFoundError kalau
+    # shapefile juga tidak ada; dashboard menampilkan pesan, bukan error)
+    def baca():
+        path = district_asset_dir(asset_dir) / INDEX_KABUPATEN
+        if not path.exists():
+            build_district_assets(asset_dir=asset_dir)
+        with open(path, encoding="utf-8") as f:
+            return DistrictIndex(json.load(f)["provinsi"])
+
+    return shared_cache.get_or_compute(("district_index", str(asset_dir)), baca)
+
+
+def load_district_geojson(provinsi, asset_dir=config.ASSET_DIR):
+    # GeoJSON kabupaten/kota satu provinsi saja; None kalau provinsi tidak dikenal
+    entry = load_district_index(asset_dir).lookup(provinsi)
+    if entry is None:
+        return None
+
+    def baca():
+        path = district_asset_dir(asset_dir) / entry["file"]
+        with span("geo.read_geojson"), open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    return shared_cache.get_or_compute(
+        ("geojson_kabupaten", entry["PROVINCE_PCODE"], str(asset_dir)), baca)
+
+
+def district_names(geojson) -> list:
+    return [feature["properties"]["ADM2_EN"] for feature in geojson["features"]]
+
+
+# ---- URL statis ----
+
+def static_geojson_url(path, subdir="geo", static_dir=config.STATIC_DIR) -> str:
+    # Salin aset ke folder static (hanya kalau belum ada atau asetnya lebih
+    # baru); ?v= dari mtime supaya browser mengambil ulang setelah build ulang
+    path = Path(path)
+    mtime = int(path.stat().st_mtime)
+    tujuan = Path(static_dir) / subdir / path.name
+    if not tujuan.exists() or int(tujuan.stat().st_mtime) != mtime:
+        tujuan.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = tujuan.with_name(f".{tujuan.name}.{os.getpid()}.tmp")
+        shutil.copy2(path, tmp_path)
+        os.replace(tmp_path, tujuan)
+    return f"{config.STATIC_URL}/{subdir}/{path.name}?v={mtime}"
+
+
+def province_geojson_url(tolerance=DEFAULT_TOLERANSI, asset_dir=config.ASSET_DIR,
+                         static_dir=config.STATIC_DIR) -> str:
+    path = asset_path(tolerance, asset_dir)
+    if not path.exists():
+        build_province_assets(asset_dir=asset_dir, tolerances=(tolerance,))
+    return static_geojson_url(path, "geo", static_dir)
+
+
+def district_geojson_url(provinsi, asset_dir=config.ASSET_DIR, static_dir=config.STATIC_DIR):
+    # None kalau provinsi tidak dikenal
+    entry = load_district_index(asset_dir).lookup(provinsi)
+    if entry is None:
+        return None
+    path = district_asset_dir(asset_dir) / entry["file"]
+    return static_geojson_url(path, "geo/kabupaten", static_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build aset GeoJSON provinsi dan kabupaten/kota")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--level", choices=["adm1", "adm2", "semua"], default="semua")
+    parser.add_argument("--src", default=config.ADM1_PATH)
+    parser.add_argument("--src-adm2", default=config.ADM2_PATH)
+    parser.add_argument("--tolerances", type=float, nargs="+", default=list(TOLERANSI))
+    parser.add_argument("--precision", type=int, default=PRESISI)
+    args = parser.parse_args()
+
+    if args.level in ("adm1", "semua"):
+        for path in build_province_assets(args.src, tolerances=args.tolerances,
+                                          precision=args.precision):
+            print(f"{path}  {path.stat().st_size / 1024:.0f} KB")
+
+    if args.level in ("adm2", "semua"):
+        paths = build_district_assets(args.src_adm2, precision=args.precision)
+        ukuran = [path.stat().st_size / 1024 for path in paths]
+        print(f"{district_asset_dir()}  {len(paths)} provinsi, "
+              f"{sum(ukuran):.0f} KB total, terbesar {max(ukuran):.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
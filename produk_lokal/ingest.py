@@ -0,0 +1,333 @@
+# ---- Ingest inkremental ----
+# Batch scrape baru (CSV/Parquet/xlsx) dibaca dan dibersihkan per chunk
+# (streaming.py) dengan pipeline yang sama seperti workbook, dideduplikasi
+# berdasarkan PRODUCT LINK terhadap isi store, lalu ditulis ke store yang dipartisi:
+#   store/tanggal=YYYY-MM-DD/marketplace=<nama>/part-<versi>-<chunk>.parquet
+# Memori puncak mengikuti ukuran chunk (plus hash link store, 8 byte per
+# produk), bukan ukuran file.
+# Cube agregat (_cube.parquet) dan sketch kuantil harga (_sketch.parquet) di
+# store diperbarui dengan delta batch saja.
+# Store yang masih kosong diisi dulu dengan workbook (config.DATA_PATH) sebagai
+# batch pertama: begitu store ada dashboard hanya membaca store, jadi tanpa ini
+# listing workbook hilang dari dashboard setelah ingest pertama.
+# Asumsi: hanya satu proses penulis dalam satu waktu.
+#
+#   python -m produk_lokal.ingest blibli.xlsx bukalapak.xlsx olx.csv [--workers 4] [--tanggal 2025-03-24]
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+from . import config, streaming
+from .cube import build_cube, merge_cubes
+from .loader import compact_frame
+from .profiling import traced
+from .sketch import build_sketches, merge_sketches
+
+MANIFEST = "_manifest.json"
+CUBE = "_cube.parquet"
+SKETCH = "_sketch.parquet"
+
+
+def batch_dates(raw: pd.DataFrame, tanggal=None) -> pd.Series:
+    # Tanggal partisi per baris: argumen --tanggal, atau tanggal CRAWLER_AT,
+    # atau hari ini kalau keduanya tidak ada
+    if tanggal is None and "CRAWLER_AT" in raw:
+        hari_ini = date.today().isoformat()
+        crawler_at = pd.to_datetime(raw["CRAWLER_AT"], errors="coerce")
+        return crawler_at.dt.strftime("%Y-%m-%d").fillna(hari_ini)
+    return pd.Series(tanggal or date.today().isoformat(), index=raw.index)
+
+
+# ---- Manifest ----
+
+def read_manifest(store_dir=config.STORE_DIR) -> dict:
+    path = Path(store_dir) / MANIFEST
+    if not path.exists():
+        return {"versi": 0, "batch": []}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_atomic(path: Path, tulis):
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tulis(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _write_manifest(manifest, store_dir):
+    def tulis(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+    _write_atomic(Path(store_dir) / MANIFEST, tulis)
+
+
+def store_exists(store_dir=config.STORE_DIR) -> bool:
+    return (Path(store_dir) / MANIFEST).exists()
+
+
+def store_version(store_dir=config.STORE_DIR) -> str:
+    return f"store-{read_manifest(store_dir)['versi']}"
+
+
+# ---- Baca store ----
+
+def _part_files(store_dir):
+    return sorted(Path(store_dir).glob("tanggal=*/marketplace=*/part-*.parquet"))
+
+
+def _stored_links(store_dir) -> streaming.LinkDedup:
+    # Hash PRODUCT LINK yang sudah ada di store, dibaca per file partisi
+    hashes = [streaming.link_hashes(pd.read_parquet(part, columns=["PRODUCT LINK"])["PRODUCT LINK"])
+              for part in _part_files(store_dir)]
+    return streaming.LinkDedup(np.concatenate(hashes) if hashes else None)
+
+
+@traced("load.read_store")
+def read_store(store_dir=config.STORE_DIR) -> pd.DataFrame:
+    # Tanpa cache memori proses: dashboard memanggilnya lewat snapshot, yang
+    # menyimpan hasilnya sekali per versi store sebagai tabel Arrow bersama
+    parts = [pd.read_parquet(part) for part in _part_files(store_dir)]
+    df = compact_frame(pd.concat(parts, ignore_index=True))
+
+    # Ringkasan kualitas lokasi dijumlahkan dari semua batch
+    batch = read_manifest(store_dir)["batch"]
+    baris = sum(b["baris"] for b in batch)
+    tidak_cocok = sum(b["lokasi_tidak_cocok"] for b in batch)
+    df.attrs["lokasi"] = {
+        "baris": baris,
+        "tidak_cocok": tidak_cocok,
+        "rasio_tidak_cocok": tidak_cocok / baris if baris else 0.0,
+    }
+    return df
+
+
+def load_store_cube(store_dir=config.STORE_DIR) -> pd.DataFrame:
+    return pd.read_parquet(Path(store_dir) / CUBE)
+
+
+def load_store_sketches(store_dir=config.STORE_DIR):
+    # None untuk store lama yang dibuat sebelum ada sketch (snapshot membangunnya dari tabel)
+    path = Path(store_dir) / SKETCH
+    return pd.read_parquet(path) if path.exists() else None
+
+
+# ---- Tulis store ----
+# Dua tahap: prepare_batch (baca + pembersihan + resolusi lokasi per chunk,
+# berat di CPU, aman dijalankan paralel di proses lain; hasil bersih ditulis ke
+# file spool Parquet di store, satu row group per chunk) lalu commit_batch
+# (baca spool per row group, dedup terhadap store, tulis partisi, cube, sketch
+# dan manifest; selalu di satu proses).
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _clean_chunks(path, tanggal, chunksize, kualitas):
+    # Chunk bersih + kolom tanggal partisi (CRAWLER_AT hanya dipakai untuk itu)
+    for chunk in streaming.iter_clean_chunks(path, chunksize, kualitas, extra=["CRAWLER_AT"]):
+        chunk["tanggal"] = batch_dates(chunk, tanggal)
+        yield chunk.drop(columns="CRAWLER_AT", errors="ignore")
+
+
+def prepare_batch(path, tanggal=None, sha=None, store_dir=config.STORE_DIR,
+                  chunksize=streaming.CHUNKSIZE) -> dict:
+    path = Path(path)
+    mulai = time.perf_counter()
+    sha = sha or file_sha256(path)
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+
+    spool = store_dir / f".spool-{sha[:16]}.parquet"
+    kualitas = {"baris": 0, "tidak_cocok": 0}
+    try:
+        streaming.write_chunks(_clean_chunks(path, tanggal, chunksize, kualitas), spool)
+    except BaseException:
+        spool.unlink(missing_ok=True)
+        raise
+    return {
+        "path": path,
+        "sha256": sha,
+        "spool": spool,
+        "lokasi": kualitas,
+        "detik": time.perf_counter() - mulai,
+    }
+
+
+def _iter_spool(spool):
+    if not spool.exists():
+        return
+    parquet = pq.ParquetFile(spool)
+    for i in range(parquet.num_row_groups):
+        yield compact_frame(parquet.read_row_group(i).to_pandas())
+
+
+def commit_batch(batch, store_dir=config.STORE_DIR, manifest=None, seen=None) -> dict:
+    # seen: hash PRODUCT LINK yang sudah ada di store (streaming.LinkDedup);
+    # kalau diberikan (ingest_many) tidak dibaca ulang dari disk dan ikut
+    # bertambah dengan link batch ini
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    if manifest is None:
+        manifest = read_manifest(store_dir)
+    if seen is None:
+        seen = _stored_links(store_dir)
+
+    mulai = time.perf_counter()
+    versi = manifest["versi"] + 1
+    bersih = baru_total = 0
+    cube = sketch = None
+    try:
+        for i, df in enumerate(_iter_spool(batch["spool"])):
+            bersih += len(df)
+            # Dedup terhadap store dan chunk sebelumnya (dalam file sudah di iter_clean_chunks)
+            baru = seen(df)
+            if baru.empty:
+                continue
+            baru_total += len(baru)
+
+            tanggal = baru.pop("tanggal")
+            for (tgl, marketplace), bagian in baru.groupby([tanggal, baru["MARKETPLACE"]], observed=True):
+                part_dir = store_dir / f"tanggal={tgl}" / f"marketplace={marketplace}"
+                part_dir.mkdir(parents=True, exist_ok=True)
+                _write_atomic(part_dir / f"part-{versi:06d}-{i:04d}.parquet",
+                              lambda tmp_path, bagian=bagian: bagian.to_parquet(tmp_path, index=False))
+
+            # Delta cube dan sketch kuantil batch ini, dilipat per chunk
+            delta = build_cube(baru)
+            cube = delta if cube is None else merge_cubes(cube, delta)
+            delta = build_sketches(baru)
+            sketch = delta if sketch is None else merge_sketches(sketch, delta)
+    finally:
+        batch["spool"].unlink(missing_ok=True)
+
+    # Cube dan sketch di store diperbarui dengan delta batch, bukan dihitung
+    # ulang dari semua baris
+    if cube is not None:
+        cube_path = store_dir / CUBE
+        cube = merge_cubes(pd.read_parquet(cube_path), cube) if cube_path.exists() else merge_cubes(cube)
+        _write_atomic(cube_path, lambda tmp_path: cube.to_parquet(tmp_path, index=False))
+
+        sketch_path = store_dir / SKETCH
+        sketch = merge_sketches(pd.read_parquet(sketch_path), sketch) if sketch_path.exists() \
+            else merge_sketches(sketch)
+        _write_atomic(sketch_path, lambda tmp_path: sketch.to_parquet(tmp_path, index=False))
+
+    info = {
+        "file": batch["path"].name,
+        "sha256": batch["sha256"],
+        "waktu": pd.Timestamp.now().isoformat(timespec="seconds"),
+        "baris": batch["lokasi"]["baris"],
+        "lokasi_tidak_cocok": batch["lokasi"]["tidak_cocok"],
+        "baris_baru": baru_total,
+        "duplikat": bersih - baru_total,
+        "detik": round(batch["detik"] + time.perf_counter() - mulai, 3),
+    }
+    # Manifest ditulis terakhir: versi store baru terlihat setelah semua file siap
+    manifest["versi"] = versi
+    manifest["batch"].append(info)
+    _write_manifest(manifest, store_dir)
+    return info
+
+
+def ingest_batch(path, store_dir=config.STORE_DIR, tanggal=None, chunksize=streaming.CHUNKSIZE) -> dict:
+    path = Path(path)
+    manifest = read_manifest(store_dir)
+    sha = file_sha256(path)
+    if any(b["sha256"] == sha for b in manifest["batch"]):
+        return {"file": path.name, "dilewati": True}
+
+    return commit_batch(prepare_batch(path, tanggal, sha, store_dir, chunksize), store_dir, manifest)
+
+
+def ingest_many(paths, store_dir=config.STORE_DIR, tanggal=None, workers=None,
+                chunksize=streaming.CHUNKSIZE, seed=None):
+    # Banyak file sekaligus (mis. satu export per marketplace): parsing dan
+    # pembersihan paralel di process pool (openpyxl terikat GIL), commit ke
+    # store berurutan sesuai urutan argumen supaya dedup deterministik.
+    # Menghasilkan info per file begitu file itu selesai di-commit.
+    # seed: workbook yang di-ingest dulu kalau store belum berisi batch apa pun
+    # (tanggal partisi dari CRAWLER_AT-nya sendiri, bukan argumen tanggal)
+    store_dir = Path(store_dir)
+    manifest = read_manifest(store_dir)
+    if seed is not None and not manifest["batch"]:
+        seed = Path(seed)
+        info = commit_batch(prepare_batch(seed, None, None, store_dir, chunksize), store_dir, manifest)
+        yield info | {"awal": True}
+    sudah = {b["sha256"] for b in manifest["batch"]}
+
+    antrean = []
+    for path in map(Path, paths):
+        sha = file_sha256(path)
+        if sha in sudah:
+            yield {"file": path.name, "dilewati": True}
+            continue
+        sudah.add(sha)   # file identik dua kali di argumen cukup sekali
+        antrean.append((path, sha))
+    if not antrean:
+        return
+
+    workers = workers or min(len(antrean), os.cpu_count() or 1)
+    seen = _stored_links(store_dir)
+
+    if workers <= 1:
+        for path, sha in antrean:
+            yield commit_batch(prepare_batch(path, tanggal, sha, store_dir, chunksize),
+                               store_dir, manifest, seen)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(prepare_batch, path, tanggal, sha, store_dir, chunksize)
+                   for path, sha in antrean]
+        for future in futures:
+            yield commit_batch(future.result(), store_dir, manifest, seen)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest batch scrape ke store inkremental")
+    parser.add_argument("paths", nargs="+", type=Path)
+    parser.add_argument("--store", type=Path, default=config.STORE_DIR)
+    parser.add_argument("--tanggal", help="tanggal partisi (YYYY-MM-DD), default dari CRAWLER_AT")
+    parser.add_argument("--workers", type=int,
+                        help="jumlah proses pembaca paralel (default: min(jumlah file, jumlah core))")
+    parser.add_argument("--chunksize", type=int, default=streaming.CHUNKSIZE,
+                        help="baris per chunk; memori puncak mengikuti nilai ini")
+    parser.add_argument("--workbook", type=Path, default=config.DATA_PATH,
+                        help="workbook yang di-ingest dulu kalau store masih kosong")
+    parser.add_argument("--tanpa-workbook", action="store_true",
+                        help="mulai store kosong tanpa isi workbook")
+    args = parser.parse_args()
+
+    seed = None if args.tanpa_workbook else args.workbook
+    if seed is not None and not seed.exists():
+        parser.error(f"workbook {seed} tidak ada; pakai --workbook PATH atau --tanpa-workbook")
+
+    mulai = time.perf_counter()
+    total = 0
+    for info in ingest_many(args.paths, args.store, args.tanggal, args.workers, args.chunksize, seed):
+        if info.get("dilewati"):
+            print(f"{info['file']}: sudah pernah di-ingest, dilewati")
+        else:
+            total += info["baris"]
+            awal = " (store baru, isi awal dari workbook)" if info.get("awal") else ""
+            print(f"{info['file']}{awal}: {info['baris_baru']:,} baris baru, {info['duplikat']:,} duplikat "
+                  f"({info['detik']:.2f} s)")
+    detik = time.perf_counter() - mulai
+    if total:
+        print(f"total {total:,} baris dalam {detik:.2f} s ({total / detik:,.0f} baris/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# ---- Fakta narasi (precomputed) ----
+# Semua angka yang dipakai teks narasi tiap tab dihitung sekali per versi data
+# dari cube, untuk setiap kombinasi filter sekaligus (groupby + margin, bukan
+# loop per filter), lalu disimpan di tabel lookup. Saat render cukup lookup
+# dict + format, O(1) per rerun.
+#
+#   fakta = Insights(cube)
+#   fakta.share("Blibli")                      # dominasi per platform
+#   fakta.harga(kategori="Lain-Lain", provinsi="Bali")
+#   fakta.harga_text(kategori="Lain-Lain")     # + Rupiah terformat & insight
+import numpy as np
+import pandas as pd
+
+from . import analytics
+from .format import fmt_rupiah
+from .profiling import traced
+from .stats import gmean_from_sums
+
+KOSONG_SHARE = {"lokal": 0, "impor": 0, "total": 0, "persen_lokal": 0, "persen_impor": 0}
+KOSONG_HARGA = {"Lokal": 0.0, "Impor": 0.0}
+
+
+def _share_table(cube) -> dict:
+    # {marketplace atau None: share}, None = semua platform
+    jumlah = cube.groupby(["MARKETPLACE", "Produk"], observed=True)["n"].sum().unstack(fill_value=0)
+    jumlah = jumlah.reindex(columns=["Lokal", "Impor"], fill_value=0)
+    kunci = list(jumlah.index) + [None]
+    lokal = np.append(jumlah["Lokal"].to_numpy(), jumlah["Lokal"].sum())
+    impor = np.append(jumlah["Impor"].to_numpy(), jumlah["Impor"].sum())
+    total = lokal + impor
+    with np.errstate(invalid="ignore", divide="ignore"):
+        persen_lokal = np.where(total > 0, lokal / total * 100, 0)
+        persen_impor = np.where(total > 0, impor / total * 100, 0)
+
+    return {
+        mp: {"lokal": int(lokal[i]), "impor": int(impor[i]), "total": int(total[i]),
+             "persen_lokal": float(persen_lokal[i]), "persen_impor": float(persen_impor[i])}
+        for i, mp in enumerate(kunci)
+    }
+
+
+def _harga_table(cube) -> dict:
+    # {(kategori atau None, provinsi atau None): {"Lokal", "Impor"}} untuk semua
+    # kombinasi, termasuk margin "semua kategori" / "semua provinsi"
+    dasar = (cube.groupby(["Kategori", "PROVINCE", "Produk"], observed=True, dropna=False)
+             [["log_sum", "n_pos"]].sum())
+
+    tabel = {}
+    for by in (["Kategori", "PROVINCE"], ["Kategori"], ["PROVINCE"], []):
+        grup = dasar.groupby(by + ["Produk"], observed=True, dropna=False)[["log_sum", "n_pos"]].sum()
+        mean = gmean_from_sums(grup["log_sum"], grup["n_pos"])
+        for kunci, nilai in zip(grup.index, mean):
+            kunci = kunci if isinstance(kunci, tuple) else (kunci,)
+            dims = dict(zip(by, kunci[:-1]))
+            # Provinsi yang tidak dikenali (NaN) tidak bisa dipilih, hanya ikut di margin
+            if any(pd.isna(v) for v in dims.values()):
+                continue
+            letak = (dims.get("Kategori"), dims.get("PROVINCE"))
+            tabel.setdefault(letak, dict(KOSONG_HARGA))[kunci[-1]] = float(nilai)
+    return tabel
+
+
+class Insights:
+    @traced("insights.build")
+    def __init__(self, cube):
+        self._share = _share_table(cube)
+        self._harga = _harga_table(cube)
+        self.gmean_per_kategori = analytics.gmean_per_kategori(cube)
+        self.extremes = analytics.gmean_extremes(cube)
+        self.top_provinsi = analytics.top_provinsi(cube)
+
+    def share(self, marketplace=None) -> dict:
+        return self._share.get(marketplace, KOSONG_SHARE)
+
+    def harga(self, kategori=None, provinsi=None) -> dict:
+        return self._harga.get((kategori, provinsi), KOSONG_HARGA)
+
+    def harga_text(self, kategori=None, provinsi=None) -> dict:
+        mean = self.harga(kategori, provinsi)
+        return {
+            "lokal": fmt_rupiah(mean["Lokal"]),
+            "impor": fmt_rupiah(mean["Impor"]),
+            "insight": analytics.price_insight(mean["Lokal"], mean["Impor"]),
+        }
+
+    def extremes_text(self) -> dict:
+        return {
+            "max": fmt_rupiah(self.extremes["max"]["Mean Price"]),
+            "min": fmt_rupiah(self.extremes["min"]["Mean Price"]),
+        }
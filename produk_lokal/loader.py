@@ -0,0 +1,141 @@
+# ---- Load data ----
+# Workbook hanya di-parse sekali: hasil pembersihan disimpan ke cache Parquet
+# (kunci: mtime + hash isi file) dan di shared_cache supaya semua rerun dan
+# semua sesi Streamlit memakai satu salinan yang sama.
+import hashlib
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from . import config
+from .cache import shared_cache
+from .profiling import span, traced
+from .lokasi import lokasi_quality, resolve_lokasi
+
+# Naikkan kalau langkah pembersihan berubah supaya cache lama tidak dipakai
+CACHE_VERSION = 5
+
+# Filter kolom yang digunakan saja
+SELECTED_COLUMNS = [
+    'PRODUCT LINK', 'TITLE', 'PRICE', 'MARKETPLACE', 'BRAND',
+    'ASAL BRAND', 'Kategori', 'PROVINCE', 'DISTRICT'
+]
+
+# Kolom dengan sedikit nilai unik disimpan sebagai kategorikal
+CATEGORY_COLUMNS = ['MARKETPLACE', 'BRAND', 'ASAL BRAND', 'Kategori', 'PROVINCE', 'DISTRICT']
+
+_fingerprints = {}   # (path, mtime_ns, size) -> kunci cache
+
+
+# ---- Pre-processing ----
+@traced("preprocess.clean_listings")
+def clean_listings(df: pd.DataFrame) -> pd.DataFrame:
+    # Lokasi -> kabupaten/kota -> provinsi, hanya untuk nilai unik
+    with span("preprocess.resolve_lokasi"):
+        resolved = resolve_lokasi(df["LOCATION"])
+        kualitas = lokasi_quality(df["LOCATION"], resolved)
+
+    df = df.assign(PROVINCE=resolved["PROVINCE"], DISTRICT=resolved["DISTRICT"])
+    df = df[SELECTED_COLUMNS]
+    df = df.dropna()
+    df = df[df['ASAL BRAND'] != '-']
+    # Satu baris per produk (link yang sama bisa muncul lebih dari sekali)
+    df = df.drop_duplicates(subset="PRODUCT LINK")
+
+    df = compact_frame(df)
+    # Ikut tersimpan di cache Parquet (metadata pandas)
+    df.attrs["lokasi"] = kualitas
+    return df
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    # Skema ringkas: kategorikal untuk kolom berulang, flag is_local yang
+    # sudah dihitung, dan harga float32 (log-harga tetap dihitung di float64)
+    df = df.astype({kolom: "category" for kolom in CATEGORY_COLUMNS})
+    df["PRICE"] = df["PRICE"].astype("float32")
+    df["is_local"] = (df["ASAL BRAND"] == "ID").to_numpy()
+    return df
+
+
+def memory_report(asli: pd.DataFrame, ringkas: pd.DataFrame) -> pd.DataFrame:
+    # Pemakaian memori per kolom sebelum dan sesudah compact_frame
+    mb = 1024 ** 2
+    before = asli.memory_usage(deep=True, index=False) / mb
+    after = ringkas.memory_usage(deep=True, index=False) / mb
+    report = pd.DataFrame({
+        "dtype asli": asli.dtypes.astype(str),
+        "MB asli": before,
+        "dtype": ringkas.dtypes.astype(str),
+        "MB": after,
+    }).reindex(ringkas.columns)
+    report.loc["TOTAL"] = ["", before.sum(), "", after.sum()]
+    report["rasio"] = report["MB asli"] / report["MB"]
+    return report
+
+
+def source_fingerprint(path=config.DATA_PATH) -> str:
+    # Kunci cache dari mtime + hash isi file; hash hanya dihitung ulang
+    # kalau mtime/ukuran file berubah
+    path = Path(path)
+    stat = path.stat()
+    stat_key = (str(path), stat.st_mtime_ns, stat.st_size)
+
+    key = _fingerprints.get(stat_key)
+    if key is None:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        key = f"v{CACHE_VERSION}-{stat.st_mtime_ns}-{digest.hexdigest()[:16]}"
+        _fingerprints[stat_key] = key
+    return key
+
+
+def _read_or_build(path: Path, key: str, cache_dir: Path) -> pd.DataFrame:
+    cache_path = cache_dir / f"{path.stem}-{key}.parquet"
+    if cache_path.exists():
+        with span("load.read_parquet"):
+            return pd.read_parquet(cache_path)
+
+    with span("load.read_excel"):
+        raw = pd.read_excel(path)
+    df = clean_listings(raw)
+
+    # Tulis ke file sementara lalu rename supaya proses lain tidak membaca
+    # file Parquet yang belum selesai ditulis
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+    with span("load.write_parquet"):
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, cache_path)
+
+    # Versi lama workbook yang sama (mtime/hash/CACHE_VERSION lain) dihapus.
+    # Kunci selalu "v<versi>-<mtime>-<hash>"; cek jumlah "-" supaya workbook
+    # lain yang namanya diawali stem ini (mis. "data-v2") tidak ikut terhapus
+    for lama in cache_dir.glob(f"{path.stem}-v*.parquet"):
+        if lama != cache_path and lama.stem[len(path.stem) + 1:].count("-") == 2:
+            lama.unlink(missing_ok=True)
+    return df
+
+
+def read_listings(path=config.DATA_PATH, cache_dir=config.CACHE_DIR) -> pd.DataFrame:
+    # Tanpa cache memori proses (mis. untuk menulis tabel Arrow bersama)
+    path = Path(path)
+    return _read_or_build(path, source_fingerprint(path), Path(cache_dir))
+
+
+def load_listings(path=config.DATA_PATH, cache_dir=config.CACHE_DIR) -> pd.DataFrame:
+    # DataFrame yang dikembalikan dipakai bersama: jangan diubah in-place
+    path = Path(path)
+    key = source_fingerprint(path)
+    return shared_cache.get_or_compute(
+        ("listings", str(path)),
+        lambda: _read_or_build(path, key, Path(cache_dir)),
+        versi=key,
+    )
+
+
+def clear_memory_cache():
+    shared_cache.invalidate(lambda key: key[0] == "listings")
+    _fingerprints.clear()
@@ -0,0 +1,118 @@
+# ---- Normalisasi lokasi penjual ----
+# Lokasi (kabupaten/kota hasil scrape) dinormalisasi ke nama ADM2 BPS lalu
+# langsung dipetakan ke provinsi. Kasus khusus diambil dari tabel
+# data/lokasi_alias.csv:
+#   jenis = khusus : dicocokkan dengan lokasi apa adanya (sebelum aturan umum)
+#   jenis = kota   : nama kota yang di BPS diawali "Kota ", dicocokkan setelah
+#                    prefix "Kab." dibuang
+# Karena lokasi sangat berulang, hanya nilai unik yang dinormalisasi
+# (factorize -> resolve -> broadcast).
+import argparse
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import wilayah
+
+ALIAS_PATH = Path(__file__).resolve().parent / "data" / "lokasi_alias.csv"
+
+
+@lru_cache(maxsize=None)
+def _alias():
+    tabel = pd.read_csv(ALIAS_PATH, dtype=str)
+    per_jenis = {
+        jenis: dict(zip(grup["lokasi"], grup["district"]))
+        for jenis, grup in tabel.groupby("jenis")
+    }
+    return per_jenis.get("khusus", {}), per_jenis.get("kota", {})
+
+
+@lru_cache(maxsize=None)
+def district_to_province() -> dict:
+    # Nama kabupaten/kota yang dipakai lebih dari satu provinsi tidak bisa
+    # dipetakan dengan pasti, jadi tidak dimasukkan (dilaporkan sebagai tidak cocok)
+    ref = wilayah.load_district_ref()[["DISTRICT", "PROVINCE"]].drop_duplicates()
+    unik = ref.drop_duplicates("DISTRICT", keep=False)
+    return dict(zip(unik["DISTRICT"], unik["PROVINCE"]))
+
+
+# Mengubah lokasi berdasarkan kabupaten/kota ke nama kabupaten/kota BPS
+@lru_cache(maxsize=4096)
+def normalize_lokasi(lokasi: str) -> str:
+    khusus, kota = _alias()
+    lokasi = lokasi.strip()
+
+    # Aturan khusus
+    if lokasi in khusus:
+        return khusus[lokasi]
+
+    # Aturan umum
+    if lokasi.startswith("Kab."):
+        lokasi = lokasi.replace("Kab.", "").strip()
+
+    elif lokasi.startswith("Kota "):
+        return lokasi
+
+    elif lokasi.startswith("Jakarta"):
+        return "Kota " + lokasi
+
+    return kota.get(lokasi, lokasi)
+
+
+def resolve_lokasi(lokasi: pd.Series) -> pd.DataFrame:
+    # DISTRICT dan PROVINCE untuk tiap baris; None kalau tidak dikenali
+    kode, unik = pd.factorize(lokasi)
+    district = np.array([normalize_lokasi(str(v)) for v in unik] + [None], dtype=object)
+    province = np.array(
+        [district_to_province().get(d) for d in district[:-1]] + [None], dtype=object)
+
+    # kode -1 (lokasi kosong) menunjuk elemen terakhir = None
+    return pd.DataFrame(
+        {"DISTRICT": district[kode], "PROVINCE": province[kode]},
+        index=lokasi.index,
+    )
+
+
+def unmatched_report(lokasi: pd.Series, resolved: pd.DataFrame) -> pd.DataFrame:
+    # Lokasi yang tidak berhasil dipetakan ke provinsi, urut dari yang terbanyak
+    mask = resolved["PROVINCE"].isna()
+    return (
+        pd.DataFrame({"LOCATION": lokasi[mask], "DISTRICT": resolved["DISTRICT"][mask]})
+        .value_counts(dropna=False)
+        .reset_index(name="Jumlah")
+    )
+
+
+def lokasi_quality(lokasi: pd.Series, resolved: pd.DataFrame, top=20) -> dict:
+    # Ringkasan kualitas data lokasi (disimpan di df.attrs["lokasi"] oleh loader)
+    laporan = unmatched_report(lokasi, resolved)
+    total = len(lokasi)
+    tidak_cocok = int(laporan["Jumlah"].sum())
+    return {
+        "baris": total,
+        "tidak_cocok": tidak_cocok,
+        "rasio_tidak_cocok": tidak_cocok / total if total else 0.0,
+        "teratas": laporan.head(top).astype({"LOCATION": str, "DISTRICT": str})
+                          .to_dict("records"),
+    }
+
+
+def main():
+    from . import config
+
+    parser = argparse.ArgumentParser(description="Laporan lokasi yang tidak dikenali")
+    parser.add_argument("path", nargs="?", default=config.DATA_PATH)
+    args = parser.parse_args()
+
+    lokasi = pd.read_excel(args.path, usecols=["LOCATION"])["LOCATION"]
+    resolved = resolve_lokasi(lokasi)
+    laporan = unmatched_report(lokasi, resolved)
+    print(laporan.to_string(index=False))
+    print(f"\n{laporan['Jumlah'].sum()} dari {len(lokasi)} baris tidak dikenali "
+          f"({laporan['Jumlah'].sum() / max(len(lokasi), 1):.1%})")
+
+
+if __name__ == "__main__":
+    main()
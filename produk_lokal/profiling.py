@@ -0,0 +1,178 @@
+# ---- Instrumentasi hot path ----
+# Span waktu + delta memori (RSS) per langkah: load, pre-processing, agregasi,
+# tiap chart dan serialisasi figure. Span dikumpulkan per rerun (satu "trace"
+# per thread script Streamlit) dan trace yang selesai disimpan di buffer
+# proses, bisa ditampilkan di sidebar atau ditulis ke JSON.
+#
+# Nonaktif secara default (env PRODUK_LOKAL_PROFILE=1 untuk mengaktifkan):
+# span() mengembalikan context kosong dan fungsi @traced langsung dipanggil,
+# jadi biayanya hanya satu pengecekan flag.
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from . import config
+
+MAX_TRACE = 200   # trace terakhir yang disimpan di memori proses
+
+_aktif = config.PROFILE
+_lokal = threading.local()
+_selesai = deque(maxlen=MAX_TRACE)
+_lock = threading.Lock()
+_NULL = contextlib.nullcontext()
+
+try:
+    _PAGE_MB = os.sysconf("SC_PAGE_SIZE") / 1024 ** 2
+except (AttributeError, ValueError, OSError):
+    _PAGE_MB = None
+
+
+def rss_mb() -> float:
+    # RSS proses saat ini; /proc murah dibaca, fallback ke RSS puncak
+    if _PAGE_MB is not None:
+        try:
+            with open("/proc/self/statm") as f:
+                return int(f.read().split()[1]) * _PAGE_MB
+        except OSError:
+            pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def enabled() -> bool:
+    return _aktif
+
+
+def enable(aktif=True):
+    global _aktif
+    _aktif = aktif
+
+
+# ---- Trace per rerun ----
+
+class Trace:
+    def __init__(self, label):
+        self.label = label
+        self.waktu = time.time()
+        self.mulai = time.perf_counter()
+        self.rss_awal = rss_mb()
+        self.spans = []
+        self.depth = 0
+        self.detik = None
+        self.mem_mb = None
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.mulai
+
+    def finish(self):
+        self.detik = self.elapsed()
+        self.mem_mb = rss_mb() - self.rss_awal
+
+    def to_dict(self) -> dict:
+        return {
+            "label": self.label,
+            "waktu": self.waktu,
+            "detik": self.detik,
+            "mem_mb": self.mem_mb,
+            "spans": self.spans,
+        }
+
+
+def _simpan(trace):
+    trace.finish()
+    with _lock:
+        _selesai.append(trace)
+    if config.PROFILE_LOG:
+        with _lock, open(config.PROFILE_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps(trace.to_dict(), ensure_ascii=False) + "\n")
+
+
+def begin_rerun(label="rerun"):
+    # Dipanggil di awal script; trace lama yang tidak sempat ditutup (script
+    # berhenti karena exception/rerun) dibuang
+    if _aktif:
+        _lokal.trace = Trace(label)
+
+
+def end_rerun():
+    trace = getattr(_lokal, "trace", None)
+    if trace is not None:
+        _lokal.trace = None
+        _simpan(trace)
+
+
+def current_trace():
+    return getattr(_lokal, "trace", None)
+
+
+@contextlib.contextmanager
+def _span(name):
+    # Tanpa trace aktif (fragment, CLI) span ini menjadi trace sendiri
+    trace = getattr(_lokal, "trace", None)
+    sendiri = trace is None
+    if sendiri:
+        trace = _lokal.trace = Trace(name)
+
+    catatan = {"nama": name, "depth": trace.depth,
+               "mulai": time.perf_counter() - trace.mulai}
+    rss_awal = rss_mb()
+    trace.depth += 1
+    try:
+        yield catatan
+    finally:
+        trace.depth -= 1
+        catatan["detik"] = time.perf_counter() - trace.mulai - catatan["mulai"]
+        catatan["mem_mb"] = rss_mb() - rss_awal
+        trace.spans.append(catatan)
+        if sendiri:
+            _lokal.trace = None
+            _simpan(trace)
+
+
+def span(name):
+    return _span(name) if _aktif else _NULL
+
+
+def traced(name=None):
+    def decorator(fn):
+        nama = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _aktif:
+                return fn(*args, **kwargs)
+            with _span(nama):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ---- Hasil ----
+
+def recent_traces() -> list:
+    with _lock:
+        return [trace.to_dict() for trace in _selesai]
+
+
+def span_table(trace):
+    # Span diurutkan menurut waktu mulai, nama diindentasi sesuai kedalaman
+    import pandas as pd
+
+    spans = sorted(trace.spans, key=lambda s: s["mulai"])
+    return pd.DataFrame({
+        "Langkah": ["  " * s["depth"] + s["nama"] for s in spans],
+        "ms": [round(s["detik"] * 1000, 2) for s in spans],
+        "Δ MB": [round(s["mem_mb"], 1) for s in spans],
+    })
+
+
+def dump_json(path=None) -> str:
+    teks = json.dumps(recent_traces(), ensure_ascii=False, indent=2)
+    if path is not None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(teks)
+    return teks
@@ -0,0 +1,107 @@
+# ---- Sketch kuantil harga ----
+# Sketch log-bucket (gaya DDSketch) per sel cube: harga dipetakan ke bucket
+# ceil(log_gamma(harga)), sehingga kuantil dari sketch punya galat relatif
+# maksimal ALPHA. Sketch bisa digabung dengan menjumlahkan hitungan bucket, jadi
+# statistik distribusi untuk kombinasi filter apa pun cukup dari menggabung
+# sel-sel yang cocok, dan batch baru (ingest) cukup menambah delta.
+#
+#   index = SketchIndex(build_sketches(df))
+#   index.quantiles([0.25, 0.5, 0.75], kategori="Lain-Lain", produk="Lokal")
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from .cube import DIMENSI, jenis_produk
+from .profiling import traced
+
+# Galat relatif kuantil (1%)
+ALPHA = 0.01
+GAMMA = (1 + ALPHA) / (1 - ALPHA)
+
+# Bucket khusus untuk harga <= 0 (selalu di urutan paling bawah)
+BUCKET_NOL = np.iinfo("int32").min
+
+
+def bucket_index(price) -> np.ndarray:
+    price = np.asarray(price, dtype="float64")
+    positif = price > 0
+    idx = np.ceil(np.log(np.where(positif, price, 1.0)) / np.log(GAMMA))
+    return np.where(positif, idx, BUCKET_NOL).astype("int32")
+
+
+def bucket_value(idx) -> np.ndarray:
+    # Nilai representatif bucket (galat relatif <= ALPHA terhadap isi bucket)
+    idx = np.asarray(idx)
+    nilai = 2 * GAMMA ** idx.astype("float64") / (GAMMA + 1)
+    return np.where(idx == BUCKET_NOL, 0.0, nilai)
+
+
+@traced("sketch.build")
+def build_sketches(df: pd.DataFrame) -> pd.DataFrame:
+    # Tabel panjang: satu baris per (sel cube, bucket) dengan jumlah harga.
+    # Harga kosong (NaN) tidak ikut, sama seperti kuantil pandas
+    ada = df["PRICE"].notna().to_numpy()
+    frame = df.loc[ada, ["MARKETPLACE", "PROVINCE", "Kategori"]].reset_index(drop=True)
+    frame["Produk"] = pd.Categorical(jenis_produk(df)[ada], categories=["Lokal", "Impor"])
+    frame["bucket"] = bucket_index(df["PRICE"].to_numpy()[ada])
+    # dropna=False: provinsi yang tidak dikenali tetap ikut di irisan "semua provinsi"
+    return frame.groupby(DIMENSI + ["bucket"], sort=False, observed=True, dropna=False).size() \
+                .reset_index(name="count")
+
+
+def merge_sketches(*sketches) -> pd.DataFrame:
+    # Dimensi digabung sebagai kategorikal (bukan string seperti merge_cubes):
+    # tabel sketch bisa ratusan ribu baris (sel x bucket terisi)
+    gabungan = pd.DataFrame({
+        kolom: union_categoricals([pd.Categorical(sketch[kolom]) for sketch in sketches])
+        for kolom in DIMENSI
+    })
+    gabungan["bucket"] = np.concatenate([sketch["bucket"].to_numpy() for sketch in sketches])
+    gabungan["count"] = np.concatenate([sketch["count"].to_numpy() for sketch in sketches])
+    return gabungan.groupby(DIMENSI + ["bucket"], sort=False, observed=True, dropna=False)["count"] \
+                   .sum().reset_index()
+
+
+class SketchIndex:
+    # Bentuk siap-query dari tabel sketch: matriks padat (sel x bucket), jadi
+    # query cukup memilih baris sel yang cocok lalu menjumlahkannya
+    @traced("sketch.index")
+    def __init__(self, sketch: pd.DataFrame):
+        grup = sketch.groupby(DIMENSI, sort=False, observed=True, dropna=False)
+        kode_sel = grup.ngroup().to_numpy()
+        self.cells = grup.size().index.to_frame(index=False)
+        self._dims = {kolom: self.cells[kolom].to_numpy(dtype=object) for kolom in DIMENSI}
+
+        # Bucket nol dipetakan ke kolom 0, bucket lain mulai kolom 1
+        bucket = sketch["bucket"].to_numpy()
+        positif = bucket != BUCKET_NOL
+        self.offset = int(bucket[positif].min()) if positif.any() else 0
+        kolom = np.where(positif, bucket - self.offset + 1, 0)
+        n_kolom = int(kolom.max()) + 1 if len(kolom) else 1
+
+        # int32 cukup per sel; penjumlahan antar sel memakai int64
+        self.matrix = np.zeros((len(self.cells), n_kolom), dtype="int32")
+        np.add.at(self.matrix, (kode_sel, kolom), sketch["count"].to_numpy())
+        self.values = bucket_value(np.r_[BUCKET_NOL, np.arange(n_kolom - 1) + self.offset])
+        self.nbytes = self.matrix.nbytes
+
+    def histogram(self, marketplace=None, provinsi=None, kategori=None, produk=None) -> np.ndarray:
+        # Sama dengan slice_cube, tapi langsung pada array numpy (sel sedikit)
+        mask = np.ones(len(self.cells), dtype=bool)
+        for kolom, nilai in (("MARKETPLACE", marketplace), ("PROVINCE", provinsi),
+                             ("Kategori", kategori), ("Produk", produk)):
+            if nilai is not None:
+                mask &= self._dims[kolom] == nilai
+        return self.matrix[mask].sum(axis=0, dtype="int64")
+
+    def quantiles(self, qs, **filter) -> np.ndarray:
+        return histogram_quantiles(self.values, self.histogram(**filter), qs)
+
+
+def histogram_quantiles(values, count, qs) -> np.ndarray:
+    kumulatif = np.cumsum(count)
+    if len(kumulatif) == 0 or kumulatif[-1] == 0:
+        return np.full(len(qs), np.nan)
+    # Peringkat (0-based) seperti kuantil 'lower'; galat relatif <= ALPHA
+    rank = np.floor(np.asarray(qs) * (kumulatif[-1] - 1))
+    return values[np.searchsorted(kumulatif, rank, side="right")]
@@ -0,0 +1,132 @@
+# ---- Snapshot data + refresher latar belakang ----
+# Snapshot = satu versi data yang siap dipakai dashboard: tabel Arrow bersama,
+# cube, sketch kuantil harga, filter index dan fakta narasi. Refresher memeriksa sumber data (workbook atau store
+# inkremental) di thread latar belakang; kalau versinya berubah, snapshot baru
+# dibangun di luar jalur request lalu ditukar sekaligus (satu assignment).
+# Rerun yang sedang berjalan tetap memakai snapshot yang diambilnya di awal
+# script sampai selesai; rerun berikutnya mendapat snapshot baru.
+import threading
+import time
+
+from . import arrow_store, config, ingest
+from .cache import shared_cache
+from .cube import build_cube
+from .filters import FilterIndex
+from .insights import Insights
+from .loader import read_listings, source_fingerprint
+from .profiling import span
+from .sketch import SketchIndex, build_sketches
+
+CUBE_COLUMNS = ["MARKETPLACE", "PROVINCE", "Kategori", "is_local", "PRICE"]
+
+
+def current_source():
+    # (versi, fungsi baca tanpa cache) untuk sumber data yang aktif. Store
+    # menggantikan workbook sepenuhnya; isi workbook masuk ke store sebagai
+    # batch pertama (lihat ingest.ingest_many)
+    if ingest.store_exists():
+        return ingest.store_version(), ingest.read_store
+    return source_fingerprint(), read_listings
+
+
+class Snapshot:
+    def __init__(self, versi, tabel, cube, sketches, filter_index, insights, detik):
+        self.versi = versi
+        self.tabel = tabel
+        self.cube = cube
+        self.sketches = sketches
+        self.filter_index = filter_index
+        self.insights = insights
+        self.dibuat = time.time()
+        self.detik = detik
+
+
+def build_snapshot(versi, baca) -> Snapshot:
+    mulai = time.perf_counter()
+    with span("snapshot.build"):
+        tabel = arrow_store.shared_listings(versi, baca)
+        if ingest.store_exists():
+            cube = ingest.load_store_cube()
+            sketch = ingest.load_store_sketches()
+            if sketch is None:
+                sketch = build_sketches(arrow_store.to_frame(tabel, CUBE_COLUMNS))
+        else:
+            frame = arrow_store.to_frame(tabel, CUBE_COLUMNS)
+            cube = build_cube(frame)
+            sketch = build_sketches(frame)
+        sketches = SketchIndex(sketch)
+        filter_index = FilterIndex(tabel)
+        insights = Insights(cube)
+    return Snapshot(versi, tabel, cube, sketches, filter_index, insights,
+                    time.perf_counter() - mulai)
+
+
+class Refresher:
+    def __init__(self, interval=config.REFRESH_INTERVAL):
+        self.interval = interval
+        self.terakhir_cek = None
+        self.galat = None
+        self._snapshot = None
+        self._lock = threading.Lock()     # satu pembangun snapshot dalam satu waktu
+        self._thread = None
+        self._stop = threading.Event()
+
+    def get(self) -> Snapshot:
+        # Dipanggil sekali di awal tiap rerun. Hanya request pertama (belum ada
+        # snapshot sama sekali) yang menunggu build; selanjutnya tidak pernah
+        if self._snapshot is None:
+            self.check()
+        elif self.interval <= 0:
+            self.check()
+        self._start()
+        return self._snapshot
+
+    def check(self) -> bool:
+        # True kalau snapshot baru dipasang
+        with self._lock:
+            self.terakhir_cek = time.time()
+            try:
+                versi, baca = current_source()
+                if self._snapshot is not None and versi == self._snapshot.versi:
+                    return False
+                snapshot = build_snapshot(versi, baca)
+            except Exception as e:
+                # Snapshot lama tetap dipakai; request pertama tetap gagal keras
+                if self._snapshot is None:
+                    raise
+                self.galat = f"{type(e).__name__}: {e}"
+                return False
+            self.galat = None
+            self._snapshot = snapshot
+            # Entri cache versi lama dibuang sekali di sini, bukan di tiap rerun
+            shared_cache.on_source_change(snapshot.versi)
+            return True
+
+    def _start(self):
+        if self.interval <= 0 or self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, name="produk-lokal-refresher", daemon=True)
+                self._thread.start()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "versi": snapshot.versi if snapshot else None,
+            "refresh_terakhir": snapshot.dibuat if snapshot else None,
+            "durasi": snapshot.detik if snapshot else None,
+            "cek_terakhir": self.terakhir_cek,
+            "galat": self.galat,
+        }
+
+
+refresher = Refresher()
@@ -0,0 +1,144 @@
+# ---- Loader streaming (per chunk) ----
+# Untuk export yang terlalu besar dimuat sekaligus: file dibaca per chunk
+# (openpyxl read-only untuk xlsx, chunk pandas untuk CSV, row group untuk
+# Parquet), hanya kolom yang dibutuhkan yang diambil, lalu tiap chunk
+# dibersihkan dan ditulis ke file Parquet. Ingest (ingest.py) memakai jalur
+# ini untuk semua batch. Memori puncak mengikuti ukuran chunk, kecuali
+# himpunan hash PRODUCT LINK untuk dedup (8 byte per produk unik).
+import gc
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .loader import CATEGORY_COLUMNS, SELECTED_COLUMNS, clean_listings
+
+# Kolom mentah yang dibutuhkan clean_listings
+RAW_COLUMNS = [kolom for kolom in SELECTED_COLUMNS if kolom not in ("PROVINCE", "DISTRICT")] + ["LOCATION"]
+
+CHUNKSIZE = 100_000
+
+
+def _iter_xlsx(path, columns, chunksize, optional):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header = next(rows)
+        columns = columns + [kolom for kolom in optional if kolom in header]
+        posisi = [header.index(kolom) for kolom in columns]
+        while True:
+            blok = list(islice(rows, chunksize))
+            if not blok:
+                break
+            df = pd.DataFrame([[row[i] for i in posisi] for row in blok], columns=columns)
+            # Sel teks kosong dianggap NaN, sama seperti pd.read_excel
+            yield df.replace("", np.nan)
+    finally:
+        wb.close()
+
+
+def _iter_parquet(path, columns, chunksize, optional):
+    parquet = pq.ParquetFile(path)
+    columns = columns + [kolom for kolom in optional if kolom in parquet.schema_arrow.names]
+    for batch in parquet.iter_batches(batch_size=chunksize, columns=columns):
+        yield batch.to_pandas()
+
+
+def _iter_xls(path, columns, chunksize, optional):
+    # Format .xls lama tidak bisa dibaca per baris (openpyxl hanya xlsx), jadi
+    # dimuat sekaligus; hanya kolom yang dibutuhkan yang disimpan
+    wanted = set(columns) | set(optional)
+    df = pd.read_excel(path, usecols=lambda kolom: kolom in wanted)
+    for mulai in range(0, len(df), chunksize):
+        yield df.iloc[mulai:mulai + chunksize]
+
+
+def iter_raw_chunks(path, columns=RAW_COLUMNS, chunksize=CHUNKSIZE, optional=()):
+    for chunk in _iter_raw(Path(path), list(columns), chunksize, optional):
+        yield chunk
+        # Frame sementara chunk sebelumnya (pembersihan, groupby) bisa saling
+        # merujuk; dibebaskan dulu sebelum chunk berikutnya dibaca
+        gc.collect()
+
+
+def _iter_raw(path, columns, chunksize, optional):
+    # optional: kolom yang ikut dibaca kalau ada di file (mis. CRAWLER_AT)
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        wanted = set(columns) | set(optional)
+        yield from pd.read_csv(path, usecols=lambda kolom: kolom in wanted, chunksize=chunksize)
+    elif suffix == ".parquet":
+        yield from _iter_parquet(path, columns, chunksize, optional)
+    elif suffix in (".xlsx", ".xlsm"):
+        yield from _iter_xlsx(path, columns, chunksize, optional)
+    elif suffix == ".xls":
+        yield from _iter_xls(path, columns, chunksize, optional)
+    else:
+        raise ValueError(f"Format file tidak dikenali: {path}")
+
+
+def link_hashes(links) -> np.ndarray:
+    return pd.util.hash_pandas_object(pd.Series(links), index=False).to_numpy()
+
+
+class LinkDedup:
+    # Dedup PRODUCT LINK lintas chunk memakai hash 64-bit yang sudah terlihat.
+    # seen selalu terurut: cek keanggotaan dengan searchsorted, sisip dengan merge
+    def __init__(self, hashes=None):
+        # hashes: link_hashes dari link yang sudah ada sebelumnya (mis. isi store)
+        self.seen = np.unique(hashes) if hashes is not None else np.array([], dtype="uint64")
+
+    def __call__(self, df):
+        # Duplikat di dalam satu chunk sudah dibuang oleh clean_listings
+        hashes = link_hashes(df["PRODUCT LINK"])
+        if len(self.seen):
+            posisi = np.searchsorted(self.seen, hashes)
+            ada = self.seen[np.minimum(posisi, len(self.seen) - 1)] == hashes
+        else:
+            ada = np.zeros(len(hashes), dtype=bool)
+
+        baru = np.sort(hashes[~ada])
+        self.seen = np.insert(self.seen, np.searchsorted(self.seen, baru), baru)
+        return df[~ada]
+
+
+def iter_clean_chunks(path, chunksize=CHUNKSIZE, kualitas=None, extra=()):
+    # kualitas (dict, opsional) diisi ringkasan lokasi tidak dikenali dari semua chunk.
+    # extra: kolom mentah yang ikut dikembalikan (kalau ada di file) di samping hasil bersih
+    dedup = LinkDedup()
+    for raw in iter_raw_chunks(path, chunksize=chunksize, optional=extra):
+        chunk = clean_listings(raw)
+        if kualitas is not None:
+            for kunci in ("baris", "tidak_cocok"):
+                kualitas[kunci] = kualitas.get(kunci, 0) + chunk.attrs["lokasi"][kunci]
+        for kolom in extra:
+            if kolom in raw:
+                chunk[kolom] = raw[kolom].loc[chunk.index]
+        yield dedup(chunk)
+
+
+def write_chunks(chunks, out) -> int:
+    # Tulis hasil bersih per chunk ke satu file Parquet (satu row group per chunk)
+    writer = None
+    jumlah = 0
+    try:
+        for chunk in chunks:
+            # Kategori tiap chunk berbeda; simpan sebagai string (Parquet tetap
+            # memakai dictionary encoding), compact_frame dipakai lagi saat dibaca
+            chunk = chunk.astype({kolom: "str" for kolom in CATEGORY_COLUMNS})
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(out, table.schema)
+            else:
+                table = table.cast(writer.schema)
+            writer.write_table(table)
+            jumlah += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return jumlah
@@ -0,0 +1,59 @@
+# ---- Referensi kabupaten/kota -> provinsi ----
+# Tabel kecil hasil turunan BPS 2020 (atribut ADM2 shapefile), disimpan di
+# produk_lokal/data supaya join lokasi tidak perlu membaca poligon sama sekali.
+#
+# Generate ulang dari file .dbf ADM2:
+#   python -m produk_lokal.wilayah build
+import argparse
+from functools import lru_cache
+from pathlib import Path
+
+import pandas as pd
+
+from . import config
+
+VERSI = "bps20200401"
+REF_PATH = Path(__file__).resolve().parent / "data" / f"kabupaten_provinsi_{VERSI}.csv"
+
+KOLOM = {
+    "ADM2_EN": "DISTRICT",
+    "ADM2_PCODE": "DISTRICT_PCODE",
+    "ADM1_EN": "PROVINCE",
+    "ADM1_PCODE": "PROVINCE_PCODE",
+}
+
+
+def build_district_ref(src=config.ADM2_PATH.with_suffix(".dbf"), out=REF_PATH) -> pd.DataFrame:
+    # Hanya tabel atribut yang dibaca, tanpa geometri
+    import geopandas as gpd
+
+    atribut = gpd.read_file(src, ignore_geometry=True)
+    ref = (
+        atribut[list(KOLOM)]
+        .rename(columns=KOLOM)
+        .drop_duplicates()
+        .sort_values(["PROVINCE_PCODE", "DISTRICT_PCODE"])
+    )
+    out.parent.mkdir(parents=True, exist_ok=True)
+    ref.to_csv(out, index=False)
+    return ref
+
+
+@lru_cache(maxsize=None)
+def load_district_ref(path=REF_PATH) -> pd.DataFrame:
+    return pd.read_csv(path, dtype=str)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate tabel kabupaten/kota -> provinsi")
+    parser.add_argument("command", choices=["build"])
+    parser.add_argument("--src", default=config.ADM2_PATH.with_suffix(".dbf"))
+    parser.add_argument("--out", type=Path, default=REF_PATH)
+    args = parser.parse_args()
+
+    ref = build_district_ref(args.src, args.out)
+    print(f"{args.out}  {len(ref)} kabupaten/kota, {ref['PROVINCE'].nunique()} provinsi")
+
+
+if __name__ == "__main__":
+    main()
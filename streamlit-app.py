@@ -1,12 +1,16 @@
 # ---- Import Libraries ----
 import streamlit as st
 import pandas as pd
-import numpy as np
-import geopandas as gpd
 import plotly.express as px
 import plotly.graph_objects as go
 import altair as alt
-from babel.numbers import format_currency
+from datetime import datetime
+import functools
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from produk_lokal import analytics, arrow_store, config, figures, geo, profiling
+from produk_lokal.boxplot import box_summary
+from produk_lokal.cache import shared_cache
+from produk_lokal.snapshot import refresher
 
 # ---- Page configuration ----
 st.set_page_config(
@@ -15,314 +19,371 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded")
 
-# ---- Load data ----
-df = pd.read_excel('Identifikasi-Brand-E-Commerce.xlsx')
-gdf = gpd.read_file("idn_adm_bps_20200401_shp/idn_admbnda_adm1_bps_20200401.shp")
-gdf2 = gpd.read_file("idn_adm_bps_20200401_shp/idn_admbnda_adm2_bps_20200401.shp")
-
-# ---- Pre-processing ----
-# Mengubah lokasi berdasarkan kabupaten/kota ke lokasi berdasarkan provinsi
-def normalize_lokasi(lokasi: str) -> str:
-    lokasi = lokasi.strip()
-
-    # Aturan khusus
-    if lokasi == "Banjarbaru":
-        return "Kota Banjar Baru"
-    if lokasi == "Bekasi Kota":
-        return "Kota Bekasi"
-    if lokasi == "Kota Surakarta (Solo)":
-        return "Kota Surakarta"
-    if lokasi == "Solo":
-        return "Kota Surakarta"
-
-    # Aturan umum
-    if lokasi.startswith("Kab."):
-        lokasi = lokasi.replace("Kab.", "").strip()
-
-    elif lokasi.startswith("Kota "):
-        return lokasi
-
-    elif lokasi.startswith("Jakarta"):
-        return "Kota " + lokasi
-
-    kota_spesial = [
-        "Depok","Medan","Surabaya",
-        "Yogyakarta","Tangerang Selatan","Cimahi",
-        "Pekanbaru","Makassar","Manado",
-        "Denpasar","Palembang","Palu",
-        "Binjai","Salatiga","Banjar"
-    ]
-    if lokasi in kota_spesial:
-        return "Kota " + lokasi
-
-    return lokasi
-
-df["DISTRICT"] = df["LOCATION"].apply(normalize_lokasi)
-
-ref = gdf2[["ADM2_EN", "ADM1_EN"]].drop_duplicates()
-ref = ref.rename(columns={"ADM2_EN": "DISTRICT", "ADM1_EN": "Provinsi"})
-
-df = df.merge(ref, on="DISTRICT", how="left")
-
-df = df.rename(columns={"Provinsi": "PROVINCE"})
-
-# Filter kolom yang digunakan saja
-selected_columns = [
-    'PRODUCT LINK', 'TITLE', 'PRICE', 'MARKETPLACE', 'BRAND',
-    'ASAL BRAND', 'Kategori', 'PROVINCE'
-]
+# Span waktu/memori per rerun (hanya kalau PRODUK_LOKAL_PROFILE=1)
+profiling.begin_rerun("script")
 
-df = df[selected_columns]
+# Ukuran spec chart yang dikirim ke browser di rerun ini (dibatasi PRODUK_LOKAL_PAYLOAD_KB)
+figures.begin_interaction("script")
 
-df = df.dropna()
-
-df.drop_duplicates()
-
-df = df[df['ASAL BRAND'] != '-']
-
-# ---- Menghitung Rata-rata Geometrik ----
-def gmean(values):
-    arr = np.array(values)
-    arr = arr[arr > 0] 
-    if len(arr) == 0:
-        return 0
-    return float(np.exp(np.mean(np.log(arr))))
+# ---- Load data ----
+# Data (tabel Arrow bersama, cube, filter index) disiapkan oleh refresher di
+# thread latar belakang; rerun hanya mengambil snapshot terbaru sekali di sini
+# dan memakainya sampai selesai, walaupun snapshot baru dipasang di tengah jalan.
+# Entri cache memakai versi snapshot di key-nya, jadi sesi lama dan baru tidak
+# saling membuang entri
+snapshot = refresher.get()
+versi_data = snapshot.versi
+tabel = snapshot.tabel
+cube = snapshot.cube
+
+# Bitmap baris per nilai filter: daftar pilihan widget dan cross-filter
+# (klik peta -> tabel kategori, peta kabupaten) memakai index yang sama
+filter_index = snapshot.filter_index
+
+# Sketch kuantil harga per sel cube: statistik boxplot tiap filter tanpa sort baris
+sketches = snapshot.sketches
+
+# Fakta narasi semua kombinasi filter, dihitung saat snapshot dibangun
+fakta = snapshot.insights
+
+def query(fn, **filter):
+    # Hasil fungsi analytics atas cube per kombinasi filter, disimpan di cache bersama
+    key = (fn.__name__, tuple(sorted(filter.items())))
+    return shared_cache.get_or_compute(key, lambda: fn(cube, **filter), versi=versi_data)
+
+def chart_dilewati(spec):
+    st.caption(
+        f"Chart tidak dikirim: batas payload per interaksi "
+        f"({config.PAYLOAD_MAX_KB:,.0f} KB) tercapai, chart ini {spec.nbytes / 1024:,.0f} KB."
+    )
 
-# ---- Format angka jadi Rupiah ----
-def fmt_rupiah(val):
-    return format_currency(val, "IDR", locale="id_ID") if val else "–"
+def fragment(label):
+    # st.fragment + span profil + hitungan payload. Di dalam run penuh fragment
+    # ikut trace & interaksi script; rerun fragment saja selalu membuka trace &
+    # interaksi sendiri. Run penuh yang berhenti di tengah (exception, rerun
+    # baru) tidak sempat memanggil end_*, jadi state thread-nya tidak dipakai ulang
+    def dekorator(fn):
+        fn = profiling.traced(label)(figures.interaction(label)(fn))
+
+        @functools.wraps(fn)
+        def wrapper():
+            ctx = get_script_run_ctx()
+            if ctx is None or not ctx.fragment_ids_this_run:
+                return fn()
+            profiling.begin_rerun(label)
+            figures.begin_interaction(label)
+            try:
+                return fn()
+            finally:
+                figures.end_interaction()
+                profiling.end_rerun()
+        return st.fragment(wrapper)
+    return dekorator
 
 # ---- Plots ----
+# Figure dibangun & diserialisasi sekali per (chart, filter, tema) per versi data
+# (figures.py); rerun berikutnya hanya mengambil spec dari cache bersama
 
-def donut_chart(df):
+@profiling.traced("chart.donut")
+def donut_chart():
     # Hitung jumlah produk lokal vs impor
-    lokal = df[df["ASAL BRAND"] == "ID"].shape[0]
-    impor = df[df["ASAL BRAND"] != "ID"].shape[0]
-
-    counts = pd.DataFrame({
-        "Produk": ["Lokal", "Impor"],
-        "Jumlah": [lokal, impor]
-    })
-    counts["Persentase"] = counts["Jumlah"] / counts["Jumlah"].sum()
-
-    # Warna custom
-    custom_colors = alt.Scale(
-        domain=["Lokal", "Impor"],
-        range=["#1f77b4", "#ff4b4b"]
-    )
-
-    # Selection interaktif (default pilih "Lokal")
-    selection = alt.selection_point(
-        fields=["Produk"],
-        value="Lokal",
-        empty="none"
-    )
-
-    base = alt.Chart(counts).encode(
-        theta=alt.Theta("Jumlah:Q", stack=True),
-        color=alt.Color("Produk:N", scale=custom_colors),
-        opacity=alt.condition(selection, alt.value(1), alt.value(0.5)),
-        tooltip=[
-            alt.Tooltip("Produk:N"),
-            alt.Tooltip("Jumlah:Q"),
-            alt.Tooltip("Persentase:Q", format=".1%")
-        ]
-    ).properties(height=280)
-
-    pie = base.mark_arc(innerRadius=72, outerRadius=130).add_selection(selection)
-
-    # Label tengah
-    text = alt.Chart(counts).mark_text(
-        font="Lato",
-        fontSize=30,
-        fontWeight=700,
-        fontStyle="italic"
-    ).encode(
-        text=alt.condition(
-            selection,
-            alt.Text("Persentase:Q", format=".1%"),
-            alt.value("")
-        ),
-        color=alt.condition(
-            selection,
-            alt.Color("Produk:N", scale=custom_colors),
-            alt.value("")
+    share = fakta.share()
+
+    def buat():
+        counts = pd.DataFrame({
+            "Produk": ["Lokal", "Impor"],
+            "Jumlah": [share["lokal"], share["impor"]],
+            "Persentase": [share["persen_lokal"] / 100, share["persen_impor"] / 100]
+        })
+
+        # Warna custom
+        custom_colors = alt.Scale(
+            domain=["Lokal", "Impor"],
+            range=["#1f77b4", "#ff4b4b"]
         )
-    ).transform_filter(selection)
-
-    chart = pie + text
-    st.altair_chart(chart, use_container_width=True)
 
-    return counts
+        # Selection interaktif (default pilih "Lokal")
+        selection = alt.selection_point(
+            fields=["Produk"],
+            value="Lokal",
+            empty="none"
+        )
 
-def bar_chart(df):
-    df = df[(df['Kategori'].apply(lambda x: isinstance(x, str))) & (df['ASAL BRAND'] == 'ID')]
-    kategori_counts = (
-        df['Kategori']
-        .value_counts()
-        .reset_index(name='Jumlah Produk')
-        .rename(columns={'index': 'Kategori'})
-    )
-    
-    st.dataframe(
-        data=kategori_counts,
-        hide_index=True,
-        column_config={
-            "Kategori": st.column_config.TextColumn("Kategori"),
-            "Jumlah Produk": st.column_config.ProgressColumn(
-                "Jumlah Produk",
-                format="%d",
-                min_value=0,
-                max_value=int(kategori_counts["Jumlah Produk"].max())
-                if not kategori_counts.empty else 0,
+        base = alt.Chart(counts).encode(
+            theta=alt.Theta("Jumlah:Q", stack=True),
+            color=alt.Color("Produk:N", scale=custom_colors),
+            opacity=alt.condition(selection, alt.value(1), alt.value(0.5)),
+            tooltip=[
+                alt.Tooltip("Produk:N"),
+                alt.Tooltip("Jumlah:Q"),
+                alt.Tooltip("Persentase:Q", format=".1%")
+            ]
+        ).properties(height=280)
+
+        pie = base.mark_arc(innerRadius=72, outerRadius=130).add_selection(selection)
+
+        # Label tengah
+        text = alt.Chart(counts).mark_text(
+            font="Lato",
+            fontSize=30,
+            fontWeight=700,
+            fontStyle="italic"
+        ).encode(
+            text=alt.condition(
+                selection,
+                alt.Text("Persentase:Q", format=".1%"),
+                alt.value("")
             ),
-        },
-        use_container_width=True
-    )
+            color=alt.condition(
+                selection,
+                alt.Color("Produk:N", scale=custom_colors),
+                alt.value("")
+            )
+        ).transform_filter(selection)
 
-# simplify untuk kurangi kompleksitas poligon
-gdf["geometry"] = gdf["geometry"].simplify(tolerance=0.01, preserve_topology=True)
+        return pie + text
 
-# cache geojson supaya tidak dihitung ulang
-geojson = gdf.__geo_interface__
+    spec = figures.altair_spec(("donut",), buat, versi=versi_data)
+    with profiling.span("render.donut"):
+        if figures.allow("donut", spec.nbytes):
+            st.vega_lite_chart(spec=spec.copy(), use_container_width=True)
+        else:
+            chart_dilewati(spec)
 
-def map_choropleth(df):
-    # Hitung jumlah penjual produk lokal per provinsi
-    count = (
-        df[df["ASAL BRAND"] == "ID"]
-        .groupby("PROVINCE").size()
-        .reset_index(name="count")
-    )
+    return share
 
-    # Gabungkan dengan shapefile
-    merged = gdf.merge(count, left_on="ADM1_EN", right_on="PROVINCE", how="left")
-    merged["count"] = merged["count"].fillna(0)
-    merged["PROVINCE"] = merged["PROVINCE"].fillna(merged["ADM1_EN"])
-
-    # Buat choropleth
-    fig = px.choropleth(
-        merged,
-        geojson=geojson,                # pakai cache geojson
-        locations=merged.index,
-        color="count",
-        color_continuous_scale=selected_color_theme,
-        hover_name="PROVINCE",
-    )
+@profiling.traced("chart.bar")
+def bar_chart(marketplace=None):
+    kategori_counts = query(analytics.kategori_counts, marketplace=marketplace)
+    
+    with profiling.span("render.bar"):
+        st.dataframe(
+            data=kategori_counts,
+            hide_index=True,
+            column_config={
+                "Kategori": st.column_config.TextColumn("Kategori"),
+                "Jumlah Produk": st.column_config.ProgressColumn(
+                    "Jumlah Produk",
+                    format="%d",
+                    min_value=0,
+                    max_value=int(kategori_counts["Jumlah Produk"].max())
+                    if not kategori_counts.empty else 0,
+                ),
+            },
+            use_container_width=True
+        )
 
-    fig.update_traces(
-        hovertemplate="<b>%{hovertext}</b><br>Jumlah Penjual: %{z}<extra></extra>"
-    )
+@profiling.traced("chart.peta")
+def map_choropleth(count, tolerance):
+    # count: jumlah penjual produk lokal per provinsi (dari cube)
+    def buat():
+        # GeoJSON provinsi baru dibaca saat peta dibangun (aset sudah disederhanakan)
+        geojson = geo.load_province_geojson(tolerance)
+
+        # Semua provinsi tetap tampil, yang tidak punya penjual diisi 0
+        merged = pd.DataFrame({"PROVINCE": geo.province_names(geojson)})
+        merged = merged.merge(count, on="PROVINCE", how="left")
+        merged["count"] = merged["count"].fillna(0)
+
+        # Mode "url": figure hanya berisi URL GeoJSON statis, bukan poligonnya
+        if config.GEOJSON_MODE == "url":
+            geojson = geo.province_geojson_url(tolerance)
+
+        # Buat choropleth
+        fig = px.choropleth(
+            merged,
+            geojson=geojson,
+            locations="PROVINCE",
+            featureidkey="properties.ADM1_EN",
+            color="count",
+            color_continuous_scale=selected_color_theme,
+            hover_name="PROVINCE",
+        )
+
+        fig.update_traces(
+            hovertemplate="<b>%{hovertext}</b><br>Jumlah Penjual: %{z}<extra></extra>"
+        )
 
-    # Fokus ke Indonesia
-    fig.update_geos(fitbounds="locations", visible=False)
-    fig.update_layout(margin={"r":0,"t":0,"l":0,"b":0}, height=500)
+        # Fokus ke Indonesia
+        fig.update_geos(fitbounds="locations", visible=False)
+        fig.update_layout(margin={"r":0,"t":0,"l":0,"b":0}, height=500)
+        return fig
+
+    # Aset GeoJSON tidak ikut repo; tanpa aset maupun shapefile peta dilewati
+    # (sama seperti peta kabupaten/kota), bagian lain tab tetap tampil
+    try:
+        spec = figures.plotly_figure(
+            ("peta", tolerance, selected_color_theme, config.GEOJSON_MODE), buat, versi=versi_data)
+    except FileNotFoundError:
+        st.caption("Peta provinsi belum tersedia: aset GeoJSON belum dibuat "
+                   "(python -m produk_lokal.geo build).")
+        return
 
     # Tampilkan chart dengan interaksi klik
-    event = st.plotly_chart(
-        fig,
-        on_select="rerun",                 # rerun saat ada seleksi
-        selection_mode=["points", "box"]   # bisa klik tunggal atau kotak
-    )
+    with profiling.span("render.peta"):
+        if figures.allow("peta", spec.nbytes):
+            event = st.plotly_chart(
+                spec.obj,
+                on_select="rerun",                 # rerun saat ada seleksi
+                selection_mode=["points", "box"]   # bisa klik tunggal atau kotak
+            )
+        else:
+            chart_dilewati(spec)
+            event = {"selection": {}}
 
-    # Ambil provinsi yang diklik
+    # Ambil provinsi yang diklik; dipakai juga untuk memfilter distribusi harga
     points = event["selection"].get("points", [])
     if points:
-        provinsi_idx = points[0].get("location")
-        provinsi = merged.loc[provinsi_idx, "PROVINCE"]
+        provinsi = points[0].get("location")
     else:
         provinsi = None
+    st.session_state["provinsi_terpilih"] = provinsi
 
-    # Jika ada provinsi dipilih, tampilkan kategori produk
+    # Jika ada provinsi dipilih, tampilkan kabupaten/kota dan kategori produk
     if provinsi:
+        map_kabupaten(provinsi)
+
         st.subheader(f"📦 Kategori Produk di {provinsi}")
-        kategori_count = (
-            df[(df["ASAL BRAND"] == "ID") & (df["PROVINCE"] == provinsi)]
-            .groupby("Kategori").size().reset_index(name="Jumlah Produk")
-            .sort_values("Jumlah Produk", ascending=False)
-        )
+        jumlah = filter_index.counts_by("kategori", provinsi=provinsi, produk="Lokal")
+        kategori_count = pd.DataFrame({"Kategori": jumlah.index, "Jumlah Produk": jumlah.to_numpy()})
 
         st.dataframe(kategori_count, hide_index=True, use_container_width=True)
 
-def grouped_bar_chart(df):
-    # Buat kolom baru asal produk
-    df_grouped_bar = df.copy()
-    df_grouped_bar['Produk'] = df_grouped_bar['ASAL BRAND'].apply(
-        lambda x: 'Lokal' if x == 'ID' else 'Impor'
-    )
-
-    # Filter hanya produk dengan label jelas
-    df_grouped_bar = df_grouped_bar[df_grouped_bar['Produk'].isin(['Lokal', 'Impor'])]
-
-    # Group by kategori & produk
-    grouped_price = (
-        df_grouped_bar.groupby(['Kategori', 'Produk'])['PRICE']
-        .agg(gmean)
-        .reset_index()
-        .rename(columns={'PRICE': 'Mean Price'})
-    )
-
-    # Chart bar rata-rata harga (grouped bar)
-    bar_chart = (
-        alt.Chart(grouped_price)
-        .mark_bar()
-        .encode(
-            x=alt.X("Kategori:N", title="Kategori", axis=alt.Axis(labelAngle=-45)),
-            y=alt.Y("Mean Price:Q", title="Rata-rata Harga"),
-            color=alt.Color("Produk:N",
-                            scale=alt.Scale(domain=["Lokal", "Impor"],
-                                            range=["#1f77b4", "#ff4b4b"]),
-                            legend=alt.Legend(title="Produk")),
-            xOffset="Produk:N",  # supaya grouped, bukan stacked
-            tooltip=[
-                alt.Tooltip("Kategori:N", title="Kategori"),
-                alt.Tooltip("Produk:N", title="Produk"),
-                alt.Tooltip("Mean Price:Q", title='Harga Rata-rata', format=',.2f')
-            ]
+@profiling.traced("chart.peta_kabupaten")
+def map_kabupaten(provinsi):
+    st.subheader(f"🏘️ Sebaran Penjual di Kabupaten/Kota {provinsi}")
+
+    # Hanya geometri kabupaten/kota provinsi yang diklik yang dibaca dan dikirim
+    try:
+        geojson = geo.load_district_geojson(provinsi)
+    except FileNotFoundError:
+        geojson = None
+    if geojson is None:
+        st.caption("Peta kabupaten/kota belum tersedia untuk provinsi ini.")
+        return
+
+    def hitung():
+        bagian = filter_index.take(tabel, ["PROVINCE", "DISTRICT", "is_local"],
+                                   provinsi=provinsi, produk="Lokal")
+        return analytics.kabupaten_counts(arrow_store.to_frame(bagian), provinsi=provinsi)
+
+    count = shared_cache.get_or_compute(("kabupaten_counts", provinsi), hitung, versi=versi_data)
+
+    def buat():
+        merged = pd.DataFrame({"DISTRICT": geo.district_names(geojson)})
+        merged = merged.merge(count, on="DISTRICT", how="left")
+        merged["count"] = merged["count"].fillna(0)
+
+        fig = px.choropleth(
+            merged,
+            geojson=geo.district_geojson_url(provinsi) if config.GEOJSON_MODE == "url" else geojson,
+            locations="DISTRICT",
+            featureidkey="properties.ADM2_EN",
+            color="count",
+            color_continuous_scale=selected_color_theme,
+            hover_name="DISTRICT",
         )
-        .properties(
-            width=700,
-            height=450
+        fig.update_traces(
+            hovertemplate="<b>%{hovertext}</b><br>Jumlah Penjual: %{z}<extra></extra>"
         )
-    )
-
-    st.altair_chart(bar_chart, use_container_width=True)
+        fig.update_geos(fitbounds="locations", visible=False)
+        fig.update_layout(margin={"r":0,"t":0,"l":0,"b":0}, height=400)
+        return fig
 
-def boxplot(df, kategori):
-    # Buat kolom baru asal produk
-    df_box = df.copy()
-    df_box['Jenis Produk'] = df_box['ASAL BRAND'].apply(lambda x: 'Lokal' if x == 'ID' else 'Impor')
+    spec = figures.plotly_figure(
+        ("peta_kabupaten", provinsi, selected_color_theme, config.GEOJSON_MODE), buat,
+        versi=versi_data)
 
-    # Filter hanya produk dengan label jelas
-    df_box = df_box[df_box['Jenis Produk'].isin(['Lokal', 'Impor'])]
+    with profiling.span("render.peta_kabupaten"):
+        if figures.allow("peta_kabupaten", spec.nbytes):
+            st.plotly_chart(spec.obj, use_container_width=True)
+        else:
+            chart_dilewati(spec)
+
+@profiling.traced("chart.grouped_bar")
+def grouped_bar_chart(grouped_price):
+    # grouped_price: rata-rata geometrik harga per kategori & produk (dari cube)
+    def buat():
+        # Chart bar rata-rata harga (grouped bar)
+        return (
+            alt.Chart(grouped_price)
+            .mark_bar()
+            .encode(
+                x=alt.X("Kategori:N", title="Kategori", axis=alt.Axis(labelAngle=-45)),
+                y=alt.Y("Mean Price:Q", title="Rata-rata Harga"),
+                color=alt.Color("Produk:N",
+                                scale=alt.Scale(domain=["Lokal", "Impor"],
+                                                range=["#1f77b4", "#ff4b4b"]),
+                                legend=alt.Legend(title="Produk")),
+                xOffset="Produk:N",  # supaya grouped, bukan stacked
+                tooltip=[
+                    alt.Tooltip("Kategori:N", title="Kategori"),
+                    alt.Tooltip("Produk:N", title="Produk"),
+                    alt.Tooltip("Mean Price:Q", title='Harga Rata-rata', format=',.2f')
+                ]
+            )
+            .properties(
+                width=700,
+                height=450
+            )
+        )
 
-    # Filter kategori (kecuali kalau pilih "Semua Kategori")
-    if kategori != "Semua Kategori":
-        df_box = df_box[df_box["Kategori"] == kategori]
+    spec = figures.altair_spec(("grouped_bar",), buat, versi=versi_data)
 
-    q95 = df_box["PRICE"].quantile(0.95)
-        
-    # Buat boxplot
-    fig = px.box(
-        df_box,
-        x='Jenis Produk',
-        y='PRICE',
-        color='Jenis Produk',
-        color_discrete_map={'Lokal': '#1f77b4', 'Impor': '#ff4b4b'}
-    )
-
-    fig.update_layout(
-        xaxis_title='Jenis Produk',
-        yaxis_title='Harga Produk',
-        yaxis_range = [0, q95 * 1.1],
-        width=800,
-        height=500
-    )
+    with profiling.span("render.grouped_bar"):
+        if figures.allow("grouped_bar", spec.nbytes):
+            st.vega_lite_chart(spec=spec.copy(), use_container_width=True)
+        else:
+            chart_dilewati(spec)
+
+@profiling.traced("chart.boxplot")
+def boxplot(kategori, provinsi=None):
+    # Statistik boxplot dari gabungan sketch sel yang cocok (< 1 ms, tidak ikut
+    # jumlah baris); figure hanya berisi kuartil, whisker dan titik outlier
+    ringkasan = box_summary(sketches, kategori, provinsi)
+    if ringkasan is None:
+        st.markdown("Belum ada data harga untuk kategori ini.")
+        return
+
+    def buat():
+        warna = {'Lokal': '#1f77b4', 'Impor': '#ff4b4b'}
+
+        # Buat boxplot
+        fig = go.Figure()
+        for produk in ["Lokal", "Impor"]:
+            stat = ringkasan["produk"].get(produk)
+            if stat is None:
+                continue
+            fig.add_trace(go.Box(
+                x=[produk], name=produk, legendgroup=produk,
+                q1=[stat["q1"]], median=[stat["median"]], q3=[stat["q3"]],
+                lowerfence=[stat["lowerfence"]], upperfence=[stat["upperfence"]],
+                marker_color=warna[produk]
+            ))
+            # Outlier (sudah dibatasi jumlahnya) sebagai titik terpisah
+            fig.add_trace(go.Scatter(
+                x=[produk] * len(stat["outliers"]), y=stat["outliers"],
+                mode="markers", legendgroup=produk, showlegend=False,
+                marker=dict(color=warna[produk], size=5),
+                hovertemplate="<b>Produk %{x}</b><br>Harga: Rp%{y:,.0f}<extra></extra>"
+            ))
+
+        fig.update_layout(
+            xaxis_title='Jenis Produk',
+            yaxis_title='Harga Produk',
+            yaxis_range = [0, ringkasan["q95"] * 1.1],
+            width=800,
+            height=500
+        )
+        return fig
 
-    fig.update_traces(
-        hovertemplate="<b>Produk %{x}</b><br>Harga: Rp%{y:,.0f}<extra></extra>"
-    )
+    spec = figures.plotly_figure(("boxplot", kategori, provinsi), buat, versi=versi_data)
 
-    st.plotly_chart(fig, use_container_width=True)
+    with profiling.span("render.boxplot"):
+        if figures.allow("boxplot", spec.nbytes):
+            st.plotly_chart(spec.obj, use_container_width=True)
+        else:
+            chart_dilewati(spec)
 
 # ---- Sidebar ----
 with st.sidebar:
@@ -335,6 +396,37 @@ with st.sidebar:
     color_theme_list = ['blues', 'cividis', 'greens', 'inferno', 'magma', 'plasma', 'reds', 'rainbow', 'turbo', 'viridis']
     selected_color_theme = st.selectbox('Pilih tema warna', color_theme_list)
 
+    selected_toleransi = st.selectbox(
+        'Detail peta', list(geo.TOLERANSI),
+        index=list(geo.TOLERANSI).index(geo.DEFAULT_TOLERANSI),
+        format_func=geo.TOLERANSI.get
+    )
+
+    # Kualitas data lokasi: baris yang lokasinya tidak bisa dipetakan ke provinsi
+    kualitas_lokasi = arrow_store.table_attrs(tabel).get("lokasi")
+    if kualitas_lokasi:
+        st.caption(
+            f"Lokasi tidak dikenali: {kualitas_lokasi['rasio_tidak_cocok']:.1%} "
+            f"({kualitas_lokasi['tidak_cocok']:,} dari {kualitas_lokasi['baris']:,} baris)"
+        )
+
+    # Refresh data latar belakang: kapan snapshot terakhir dipasang dan lama build-nya
+    status_refresh = refresher.status()
+    st.caption(
+        f"Data diperbarui {datetime.fromtimestamp(status_refresh['refresh_terakhir']):%d-%m-%Y %H:%M:%S} "
+        f"(build {status_refresh['durasi']:.1f} s)"
+    )
+    if status_refresh["galat"]:
+        st.caption(f"Refresh terakhir gagal, data lama tetap dipakai: {status_refresh['galat']}")
+
+    with st.expander("Status cache"):
+        stat = shared_cache.stats()
+        st.caption(
+            f"Hit {stat['hits']:,} / miss {stat['misses']:,} ({stat['hit_rate']:.0%}) · "
+            f"{stat['entries']} entri · {stat['size_mb']:.1f} / {stat['max_mb']:.0f} MB · "
+            f"evict {stat['evictions']:,}"
+        )
+
 # ---- Main Content ----
 st.markdown(
     """
@@ -349,45 +441,44 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-tab = st.tabs(["Dominasi Produk", "Sebaran Lokasi", "Analisis Harga"])
+# Tiap bagian interaktif dibungkus st.fragment: interaksi widget di dalamnya
+# hanya menjalankan ulang bagian itu sendiri, bukan seluruh script.
 
 # TAB 1: Dominasi Produk
-with tab[0]:
+def render_dominasi():
     st.subheader("📦 Dominasi Produk Lokal vs Impor")
     st.markdown("<div style='margin-bottom:15px;'></div>", unsafe_allow_html=True)
 
     col = st.columns((1.2, 2), gap='medium')
     with col[0]:
-        counts = donut_chart(df)
+        share = donut_chart()
     with col[1]:
-        lokal_pct = counts[counts["Produk"] == "Lokal"]["Persentase"].values[0] * 100
-        impor_pct = counts[counts["Produk"] == "Impor"]["Persentase"].values[0] * 100
-
         st.markdown(
             f"""
-            Produk lokal mencakup **{lokal_pct:.1f}%** sedangkan produk impor mencakup **{impor_pct:.1f}%** dari total penawaran di e-commerce. 
+            Produk lokal mencakup **{share['persen_lokal']:.1f}%** sedangkan produk impor mencakup **{share['persen_impor']:.1f}%** dari total penawaran di e-commerce. 
             Perbandingan ini memberikan gambaran mengenai komposisi produk yang tersedia di pasar digital, serta menunjukkan bagaimana kedua jenis produk hadir dan bersaing di platform online.
             
             Informasi ini bermanfaat untuk memahami kecenderungan penawaran produk di e-commerce, baik dalam melihat kekuatan produk dalam negeri maupun posisi produk impor di tengah persaingan pasar.
             """
         )
-    
+
+    platform_section()
+
+@fragment("fragment.platform")
+def platform_section():
     st.subheader("🔍 Analisis Produk Lokal Berdasarkan Platform")
 
     col = st.columns((1.5, 2), gap='medium')
     with col[0]:
-        marketplace_list = ['Semua Platform', 'Blibli', 'Bukalapak', 'OLX']
+        marketplace_list = ['Semua Platform'] + filter_index.options("marketplace")
         selected_marketplace = st.selectbox('Pilih Platform', marketplace_list)
 
-        if selected_marketplace == "Semua Platform":
-            df_filtered = df
-        else:
-            df_filtered = df[(df["MARKETPLACE"] == selected_marketplace)]
+        marketplace = None if selected_marketplace == "Semua Platform" else selected_marketplace
 
-        jumlah_lokal = df_filtered[df_filtered['ASAL BRAND'] == 'ID'].shape[0]
-        total_produk = df_filtered.shape[0]
-
-        persentase_lokal = (jumlah_lokal / total_produk * 100) if total_produk > 0 else 0
+        share = fakta.share(marketplace)
+        jumlah_lokal = share["lokal"]
+        total_produk = share["total"]
+        persentase_lokal = share["persen_lokal"]
 
         st.markdown(
             f"""
@@ -411,140 +502,83 @@ with tab[0]:
         )
 
     with col[1]:
-        bar_chart(df_filtered)
+        bar_chart(marketplace)
 
 # TAB 2: Sebaran Lokasi
-with tab[1]:
+def render_sebaran():
     st.subheader("🗺️ Sebaran Lokasi Penjual Produk Lokal")
 
-    # Hitung jumlah penjual produk lokal per provinsi
-    count = (
-        df[df["ASAL BRAND"] == "ID"]
-        .groupby("PROVINCE").size()
-        .reset_index(name="count")
-    )
-
-    if not count.empty:
-        # Provinsi dengan penjual terbanyak
-        top_prov = count.sort_values("count", ascending=False).iloc[0]
-        top_prov_name = top_prov["PROVINCE"]
-        top_prov_count = int(top_prov["count"])
-
-        # Kategori teratas di provinsi tersebut
-        kategori_count = (
-            df[(df["ASAL BRAND"] == "ID") & (df["PROVINCE"] == top_prov_name)]
-            .groupby("Kategori").size().reset_index(name="Jumlah Produk")
-            .sort_values("Jumlah Produk", ascending=False)
-        )
-
-        if not kategori_count.empty:
-            top_kat_name = kategori_count.iloc[0]["Kategori"]
-            top_kat_count = int(kategori_count.iloc[0]["Jumlah Produk"])
-        else:
-            top_kat_name, top_kat_count = "-", 0
+    # Provinsi dengan penjual produk lokal terbanyak dan kategori teratasnya
+    top = fakta.top_provinsi
 
+    if top is not None:
         st.markdown(
             f"""
             Peta ini menunjukkan konsentrasi penjual produk lokal di setiap provinsi. 
-            Provinsi dengan jumlah penjual terbanyak adalah **{top_prov_name}** dengan sekitar **{top_prov_count} penjual**. 
-            Di provinsi tersebut, kategori produk yang paling banyak dijual adalah **{top_kat_name}** dengan **{top_kat_count} produk**.
+            Provinsi dengan jumlah penjual terbanyak adalah **{top['provinsi']}** dengan sekitar **{top['jumlah']} penjual**. 
+            Di provinsi tersebut, kategori produk yang paling banyak dijual adalah **{top['kategori']}** dengan **{top['jumlah_kategori']} produk**.
             """
         )
     else:
         st.markdown("Belum ada data penjual produk lokal yang dapat ditampilkan.")
 
-    map_choropleth(df)
+    peta_section()
+
+@fragment("fragment.peta")
+def peta_section():
+    # Klik di peta hanya menjalankan ulang bagian peta
+    map_choropleth(query(analytics.provinsi_counts), selected_toleransi)
 
 # TAB 3: Analisis Harga
-with tab[2]:
+def render_harga():
     st.subheader("💰 Rata-rata Harga Produk Lokal vs Impor Setiap Kategori")
 
-    df_temp = df.copy()
-    df_temp['Produk'] = df_temp['ASAL BRAND'].apply(
-        lambda x: 'Lokal' if x == 'ID' else 'Impor'
-    )
-
-    df_temp = df_temp[df_temp['Produk'].isin(['Lokal', 'Impor'])]
-
-    # Hitung geometric mean per kategori & produk
-    grouped_price = (
-        df_temp.groupby(['Kategori', 'Produk'])['PRICE']
-        .agg(gmean)
-        .reset_index()
-        .rename(columns={'PRICE': 'Mean Price'})
-    )
-
-    max_row = grouped_price.loc[grouped_price['Mean Price'].idxmax()]
-    min_row = grouped_price.loc[grouped_price['Mean Price'].idxmin()]
-
-    mean_max_fmt = fmt_rupiah(max_row['Mean Price'])
-    mean_min_fmt = fmt_rupiah(min_row['Mean Price'])
+    # Rata-rata geometrik per kategori & produk (dipakai juga oleh chart) dan
+    # fakta narasi, semuanya dari lookup snapshot
+    grouped_price = fakta.gmean_per_kategori
 
-    mean_lokal = gmean(df[df["ASAL BRAND"] == "ID"]["PRICE"])
-    mean_impor = gmean(df[df["ASAL BRAND"] != "ID"]["PRICE"])
-
-    mean_lokal_fmt = fmt_rupiah(mean_lokal)
-    mean_impor_fmt = fmt_rupiah(mean_impor)
+    max_row, min_row = fakta.extremes["max"], fakta.extremes["min"]
+    extremes_fmt = fakta.extremes_text()
+    keseluruhan = fakta.harga_text()
 
     st.markdown(
         f"""
         Visualisasi berikut menampilkan rata-rata geometrik harga produk lokal dan impor pada setiap kategori. 
-        Rata-rata harga tertinggi ditemukan pada produk **{max_row['Produk']}** di kategori **{max_row['Kategori']}** dengan nilai sebesar **{mean_max_fmt}**. 
-        Sementara itu, rata-rata harga terendah terdapat pada produk **{min_row['Produk']}** di kategori **{min_row['Kategori']}** dengan nilai sebesar **{mean_min_fmt}**.
+        Rata-rata harga tertinggi ditemukan pada produk **{max_row['Produk']}** di kategori **{max_row['Kategori']}** dengan nilai sebesar **{extremes_fmt['max']}**. 
+        Sementara itu, rata-rata harga terendah terdapat pada produk **{min_row['Produk']}** di kategori **{min_row['Kategori']}** dengan nilai sebesar **{extremes_fmt['min']}**.
         
-        Jika dilihat secara keseluruhan pada semua kategori, rata-rata harga produk **lokal** berada di kisaran **{mean_lokal_fmt}**, 
-        sedangkan produk **impor** memiliki rata-rata harga sekitar **{mean_impor_fmt}**. 
+        Jika dilihat secara keseluruhan pada semua kategori, rata-rata harga produk **lokal** berada di kisaran **{keseluruhan['lokal']}**, 
+        sedangkan produk **impor** memiliki rata-rata harga sekitar **{keseluruhan['impor']}**. 
         Hal ini memberi gambaran bagaimana kedua jenis produk menempati segmen harga yang berbeda dalam pasar e-commerce.
         """
     )
 
     st.markdown("<div style='margin-bottom:15px;'></div>", unsafe_allow_html=True)
-    grouped_bar_chart(df)
+    grouped_bar_chart(grouped_price)
+
+    distribusi_section()
 
+@fragment("fragment.distribusi")
+def distribusi_section():
     st.subheader("💳 Distribusi Harga Produk Lokal vs Impor")
     col = st.columns((1.5, 2), gap='medium')
 
     with col[0]:
-        kategori_list = [
-            'Semua Kategori',
-            'Elektronik & Gadget',
-            'Fashion & Aksesoris',
-            'Hobi, Seni, & Olahraga',
-            'Ibu, Bayi & Anak',
-            'Lain-Lain',
-            'Makanan & Minuman',
-            'Otomotif & Mesin',
-            'Perawatan Diri & Kesehatan',
-            'Rumah Tangga & Furniture'
-        ]
+        kategori_list = ['Semua Kategori'] + filter_index.options("kategori")
         selected_kategori = st.selectbox('Pilih Kategori', kategori_list)
 
-        # Hitung rata-rata harga lokal vs impor sesuai kategori terpilih
-        if selected_kategori == "Semua Kategori":
-            df_filtered = df.copy()
-        else:
-            df_filtered = df[df["Kategori"] == selected_kategori]
-
-        mean_lokal = gmean(df_filtered[df_filtered["ASAL BRAND"] == "ID"]["PRICE"]) \
-            if not df_filtered[df_filtered["ASAL BRAND"] == "ID"].empty else 0
-        mean_impor = gmean(df_filtered[df_filtered["ASAL BRAND"] != "ID"]["PRICE"]) \
-            if not df_filtered[df_filtered["ASAL BRAND"] != "ID"].empty else 0
+        # Provinsi yang diklik di peta (tab Sebaran Lokasi) ikut memfilter bagian ini
+        provinsi = st.session_state.get("provinsi_terpilih")
+        if provinsi:
+            st.caption(f"Difilter ke provinsi **{provinsi}** (klik di peta)")
+            st.button("Tampilkan semua provinsi",
+                      on_click=lambda: st.session_state.update(provinsi_terpilih=None))
 
-        mean_lokal_fmt = fmt_rupiah(mean_lokal)
-        mean_impor_fmt = fmt_rupiah(mean_impor)
+        # Hitung rata-rata harga lokal vs impor sesuai kategori terpilih
+        kategori = None if selected_kategori == "Semua Kategori" else selected_kategori
+        lingkup = f"kategori **{selected_kategori}**" + (f" di **{provinsi}**" if provinsi else "")
 
-        if mean_lokal < mean_impor and mean_lokal > 0:
-            insight = (
-                "Produk impor umumnya berada pada kisaran harga yang lebih tinggi, sementara produk lokal cenderung lebih terjangkau."
-            )
-        elif mean_lokal > mean_impor and mean_impor > 0:
-            insight = (
-                "Produk lokal justru memiliki rata-rata harga lebih tinggi dibandingkan produk impor, menunjukkan adanya segmen premium pada produk dalam negeri."
-            )
-        else:
-            insight = (
-                "Harga produk lokal dan impor relatif seimbang, menunjukkan persaingan yang cukup setara di pasar e-commerce."
-            )
+        harga = fakta.harga_text(kategori, provinsi)
 
         st.markdown(
             f"""
@@ -553,8 +587,8 @@ with tab[2]:
             sedangkan garis di luar kotak menunjukkan rentang harga normal. 
             Titik yang terpisah menandakan produk dengan harga yang jauh lebih tinggi atau lebih rendah dari kebanyakan.
 
-            Pada kategori **{selected_kategori}**, rata-rata harga produk **lokal** sekitar **{mean_lokal_fmt}**, 
-            sedangkan produk **impor** sekitar **{mean_impor_fmt}**. {insight}
+            Pada {lingkup}, rata-rata harga produk **lokal** sekitar **{harga['lokal']}**, 
+            sedangkan produk **impor** sekitar **{harga['impor']}**. {harga['insight']}
 
             Dengan cara ini, kita bisa melihat apakah harga produk lokal cenderung lebih rapat atau lebih menyebar dibanding impor, 
             dan bagaimana posisi harga keduanya di pasar.
@@ -573,4 +607,37 @@ with tab[2]:
                 unsafe_allow_html=True
             )
         
-        boxplot(df, selected_kategori)
+        boxplot(kategori, provinsi)
+
+# Hanya tab yang sedang dibuka yang dihitung (peta dan boxplot tidak dibangun
+# kalau tab-nya tidak terlihat)
+tab = st.tabs(
+    ["Dominasi Produk", "Sebaran Lokasi", "Analisis Harga"],
+    key="tab_aktif",
+    on_change="rerun"
+)
+
+for container, render in zip(tab, (render_dominasi, render_sebaran, render_harga)):
+    if container.open:
+        with container:
+            render()
+
+# ---- Panel debug: span rerun ini (PRODUK_LOKAL_PROFILE=1) ----
+if profiling.enabled():
+    trace = profiling.current_trace()
+    with st.sidebar.expander("Profil rerun"):
+        if trace is not None:
+            st.caption(f"Rerun {trace.elapsed() * 1000:,.0f} ms · RSS {profiling.rss_mb():,.0f} MB")
+            st.dataframe(profiling.span_table(trace), hide_index=True, use_container_width=True)
+        st.download_button("Unduh JSON", profiling.dump_json(),
+                           file_name="profil-rerun.json", mime="application/json")
+
+# Ukuran spec chart yang dikirim rerun ini
+interaksi = figures.end_interaction()
+with st.sidebar.expander("Payload chart"):
+    st.caption(f"{interaksi.sent / 1024:,.0f} KB dari batas {interaksi.limit / 1024:,.0f} KB · "
+               f"peta mode {config.GEOJSON_MODE}")
+    if interaksi.charts:
+        st.dataframe(interaksi.to_frame(), hide_index=True, use_container_width=True)
+
+profiling.end_rerun()